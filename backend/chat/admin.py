@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ChatRoom, Message, MessageReadStatus
+from .models import ChatRoom, Message, ChatReadState
 
 
 @admin.register(ChatRoom)
@@ -23,8 +23,8 @@ class MessageAdmin(admin.ModelAdmin):
     """
     Admin interface for Message model
     """
-    list_display = ['sender', 'chat_room', 'content_preview', 'is_read', 'created_at']
-    list_filter = ['is_read', 'created_at']
+    list_display = ['sender', 'chat_room', 'content_preview', 'created_at']
+    list_filter = ['created_at']
     search_fields = ['content', 'sender__email', 'chat_room__title']
     ordering = ['-created_at']
     
@@ -34,12 +34,13 @@ class MessageAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Content'
 
 
-@admin.register(MessageReadStatus)
-class MessageReadStatusAdmin(admin.ModelAdmin):
+@admin.register(ChatReadState)
+class ChatReadStateAdmin(admin.ModelAdmin):
     """
-    Admin interface for MessageReadStatus model
+    Admin interface for ChatReadState model
     """
-    list_display = ['user', 'message', 'read_at']
-    list_filter = ['read_at']
-    search_fields = ['user__email', 'message__content']
-    ordering = ['-read_at']
+    list_display = ['user', 'chat_room', 'last_read_at', 'updated_at']
+    list_filter = ['last_read_at']
+    search_fields = ['user__email', 'chat_room__title']
+    ordering = ['-updated_at']
+    raw_id_fields = ['last_read_message']
@@ -0,0 +1,87 @@
+"""
+WebSocket consumers for chat app
+"""
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .models import ChatRoom
+from .realtime import messages_read, room_group_name
+from .services import mark_room_read
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live events of one chat room
+    ws/chat/{room_id}/?token=<access token>
+
+    Server -> client:
+        {"type": "message", "message": {...}}
+        {"type": "typing", "user_id": "...", "is_typing": true}
+        {"type": "read", "user_id": "...", "count": 3, "read_at": "..."}
+    Client -> server:
+        {"type": "typing", "is_typing": true}
+        {"type": "read"}
+    """
+    group_name = None
+
+    async def connect(self):
+        self.user = self.scope['user']
+        self.room_id = self.scope['url_route']['kwargs']['room_id']
+
+        # Rejecting before accept() fails the handshake (HTTP 403)
+        if not self.user.is_authenticated or not await self.is_participant():
+            await self.close()
+            return
+
+        self.group_name = room_group_name(self.room_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    @database_sync_to_async
+    def is_participant(self):
+        return ChatRoom.objects.filter(id=self.room_id, participants=self.user).exists()
+
+    @database_sync_to_async
+    def mark_as_read(self):
+        chat_room = ChatRoom(id=self.room_id)
+        count = mark_room_read(chat_room, self.user)
+        if count:
+            messages_read(chat_room.id, self.user, count)
+
+    async def receive_json(self, content, **kwargs):
+        event_type = content.get('type') if isinstance(content, dict) else None
+
+        if event_type == 'typing':
+            # Ephemeral, so it skips the database
+            await self.channel_layer.group_send(self.group_name, {
+                'type': 'chat.typing',
+                'user_id': str(self.user.id),
+                'is_typing': bool(content.get('is_typing', True)),
+            })
+        elif event_type == 'read':
+            await self.mark_as_read()
+        else:
+            await self.send_json({'type': 'error', 'error': 'Unknown event type.'})
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', 'message': event['message']})
+
+    async def chat_typing(self, event):
+        # Do not echo typing indicators back to the typist
+        if event['user_id'] != str(self.user.id):
+            await self.send_json({
+                'type': 'typing',
+                'user_id': event['user_id'],
+                'is_typing': event['is_typing'],
+            })
+
+    async def chat_read(self, event):
+        await self.send_json({
+            'type': 'read',
+            'user_id': event['user_id'],
+            'count': event['count'],
+            'read_at': event['read_at'],
+        })
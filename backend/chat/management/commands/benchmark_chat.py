@@ -0,0 +1,145 @@
+"""
+Management command to load test the chat WebSocket stack of one worker
+"""
+import asyncio
+import time
+import uuid
+from asgiref.testing import ApplicationCommunicator
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User
+from chat.middleware import JWTAuthMiddleware
+from chat.models import ChatRoom, Message
+from chat.realtime import message_created, room_group_name
+from chat.routing import websocket_urlpatterns
+
+
+class Command(BaseCommand):
+    help = (
+        'Connect WebSocket clients to one chat room in this process and measure '
+        'how many messages per second it fans out (throughput of one worker '
+        'on the configured channel layer; the test users and room are deleted)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=50,
+            help='Participants connected to the room',
+        )
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=200,
+            help='Messages to send',
+        )
+        parser.add_argument(
+            '--persist',
+            action='store_true',
+            help='Save every message like send_message does, not only publish it',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=5.0,
+            help='Seconds to wait for a client before counting messages as dropped',
+        )
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:12]
+        users = User.objects.bulk_create(
+            User(username=f'bench-chat-{suffix}-{n}', email=f'bench-chat-{suffix}-{n}@example.com')
+            for n in range(options['clients'])
+        )
+        room = ChatRoom.objects.create(title=f'Benchmark {suffix}', is_group=True)
+        room.participants.add(*users)
+
+        try:
+            elapsed, delivered = asyncio.run(self._run(room, users, options))
+        finally:
+            room.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        sent = options['messages']
+        expected = sent * len(users)
+        self.stdout.write(f'  clients: {len(users)}, messages: {sent}, persist: {options["persist"]}')
+        self.stdout.write(f'  elapsed: {elapsed:.3f}s')
+        self.stdout.write(self.style.SUCCESS(f'  ✓ {sent / elapsed:,.0f} messages/s'))
+        self.stdout.write(self.style.SUCCESS(f'  ✓ {delivered / elapsed:,.0f} deliveries/s'))
+        if delivered < expected:
+            self.stdout.write(self.style.WARNING(f'  ! {expected - delivered} deliveries dropped'))
+
+    async def _run(self, room, users, options):
+        application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+        clients = [
+            await self._connect(application, room, user, options['timeout'])
+            for user in users
+        ]
+
+        sender = users[0]
+        sample = {
+            'id': str(uuid.uuid4()),
+            'chat_room': str(room.id),
+            'sender': {'id': str(sender.id), 'username': sender.username},
+            'content': 'Benchmark message',
+            'created_at': timezone.now().isoformat(),
+        }
+        send_message = database_sync_to_async(self._send_message)
+        channel_layer = get_channel_layer()
+        receivers = [
+            asyncio.create_task(self._receive(client, options['messages'], options['timeout']))
+            for client in clients
+        ]
+
+        start = time.perf_counter()
+        for _ in range(options['messages']):
+            if options['persist']:
+                await send_message(room, sender)
+            else:
+                await channel_layer.group_send(
+                    room_group_name(room.id),
+                    {'type': 'chat.message', 'message': sample}
+                )
+            # Let the consumers drain their channels between messages
+            await asyncio.sleep(0)
+        delivered = sum(await asyncio.gather(*receivers))
+        elapsed = time.perf_counter() - start
+
+        for client in clients:
+            await client.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await client.wait(options['timeout'])
+        return elapsed, delivered
+
+    async def _connect(self, application, room, user, timeout):
+        client = ApplicationCommunicator(application, {
+            'type': 'websocket',
+            'path': f'/ws/chat/{room.id}/',
+            'query_string': f'token={AccessToken.for_user(user)}'.encode(),
+            'headers': [],
+            'subprotocols': [],
+        })
+        await client.send_input({'type': 'websocket.connect'})
+        response = await client.receive_output(timeout)
+        if response['type'] != 'websocket.accept':
+            raise RuntimeError(f'Connection rejected: {response}')
+        return client
+
+    async def _receive(self, client, count, timeout):
+        received = 0
+        try:
+            while received < count:
+                await client.receive_output(timeout)
+                received += 1
+        except asyncio.TimeoutError:
+            pass
+        return received
+
+    def _send_message(self, room, sender):
+        # Same writes and push as ChatRoomViewSet.send_message
+        message = Message.objects.create(chat_room=room, sender=sender, content='Benchmark message')
+        message_created(message)
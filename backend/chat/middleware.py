@@ -0,0 +1,40 @@
+"""
+WebSocket authentication for chat app (also used by the notification socket)
+"""
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@database_sync_to_async
+def get_user(raw_token):
+    """Return the active user an access token belongs to, or AnonymousUser"""
+    try:
+        user_id = AccessToken(raw_token)[api_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return AnonymousUser()
+
+    User = get_user_model()
+    try:
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        return AnonymousUser()
+    return user if user.is_active else AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Set scope['user'] from a JWT access token passed as ?token=..., since
+    browsers cannot send an Authorization header with the handshake
+    """
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        token = query.get('token', [None])[0]
+        user = await get_user(token) if token else AnonymousUser()
+        return await super().__call__(dict(scope, user=user), receive, send)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat_room', 'created_at', 'id'], name='messages_chat_ro_e6bbd9_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def backfill_read_states(apps, schema_editor):
+    """Turn per-message read statuses into one watermark per room and reader"""
+    MessageReadStatus = apps.get_model('chat', 'MessageReadStatus')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+
+    watermarks = (
+        MessageReadStatus.objects
+        .values('message__chat_room_id', 'user_id')
+        .annotate(last_read_at=models.Max('message__created_at'))
+        .order_by()
+    )
+    ChatReadState.objects.bulk_create(
+        (
+            ChatReadState(
+                chat_room_id=row['message__chat_room_id'],
+                user_id=row['user_id'],
+                last_read_at=row['last_read_at'],
+            )
+            for row in watermarks.iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chat', '0002_message_room_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatReadState',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('last_read_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('chat_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='chat.chatroom')),
+            ],
+            options={
+                'verbose_name': 'Chat Read State',
+                'verbose_name_plural': 'Chat Read States',
+                'db_table': 'chat_read_states',
+            },
+        ),
+        migrations.AddField(
+            model_name='chatreadstate',
+            name='last_read_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message'),
+        ),
+        migrations.AddField(
+            model_name='chatreadstate',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_read_states', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='chatreadstate',
+            unique_together={('chat_room', 'user')},
+        ),
+        migrations.RunPython(backfill_read_states, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+        migrations.RemoveField(
+            model_name='message',
+            name='read_at',
+        ),
+        migrations.DeleteModel(
+            name='MessageReadStatus',
+        ),
+    ]
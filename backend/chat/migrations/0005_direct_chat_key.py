@@ -0,0 +1,47 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:54
+
+from django.db import migrations, models
+
+
+def backfill_direct_keys(apps, schema_editor):
+    """
+    Key the existing direct chats; when a pair already has several, the
+    most recently active one gets the key and the others stay unkeyed
+    """
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Participant = ChatRoom.participants.through
+
+    participants = {}
+    rows = Participant.objects.filter(chatroom__is_group=False).values_list('chatroom_id', 'user_id')
+    for room_id, user_id in rows.iterator():
+        participants.setdefault(room_id, []).append(str(user_id))
+
+    keyed = set()
+    rooms = []
+    for room in ChatRoom.objects.filter(is_group=False).order_by('-updated_at').only('id'):
+        user_ids = participants.get(room.id, [])
+        if len(user_ids) != 2:
+            continue
+        first, second = sorted(user_ids)
+        key = f'{first}:{second}'
+        if key not in keyed:
+            keyed.add(key)
+            room.direct_key = key
+            rooms.append(room)
+    ChatRoom.objects.bulk_update(rooms, ['direct_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_room_last_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='direct_key',
+            field=models.CharField(blank=True, editable=False, max_length=73, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_direct_keys, migrations.RunPython.noop),
+    ]
@@ -3,9 +3,33 @@ Models for chat app
 """
 import uuid
 from django.db import models
+from django.db.models import Count, F, FilteredRelation, Q
 from django.conf import settings
 
 
+class ChatRoomQuerySet(models.QuerySet):
+    """QuerySet helpers for ChatRoom"""
+
+    def with_unread_count(self, user):
+        """
+        Annotate unread_count: messages from others after user's read
+        watermark, counted for all rooms in one grouped query
+        """
+        return self.annotate(
+            user_read_state=FilteredRelation(
+                'read_states',
+                condition=Q(read_states__user=user)
+            ),
+            unread_count=Count(
+                'messages',
+                filter=~Q(messages__sender=user) & (
+                    Q(user_read_state__last_read_at__isnull=True) |
+                    Q(messages__created_at__gt=F('user_read_state__last_read_at'))
+                )
+            )
+        )
+
+
 class ChatRoom(models.Model):
     """
     ChatRoom model - represents a conversation between users
@@ -18,9 +42,30 @@ class ChatRoom(models.Model):
     )
     title = models.CharField(max_length=255, blank=True, null=True)
     is_group = models.BooleanField(default=False)
+    # "<lower user id>:<higher user id>" for direct chats, NULL for groups;
+    # unique, so there is at most one direct chat per pair of users
+    direct_key = models.CharField(
+        max_length=73,
+        unique=True,
+        blank=True,
+        null=True,
+        editable=False
+    )
+    # Kept up to date by chat.signals, so room lists join it instead of
+    # querying each room's messages
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ChatRoomQuerySet.as_manager()
+    
     class Meta:
         db_table = 'chat_rooms'
         ordering = ['-updated_at']
@@ -32,10 +77,6 @@ class ChatRoom(models.Model):
             return self.title
         participants = self.participants.all()[:2]
         return f"Chat: {', '.join([p.get_full_name() for p in participants])}"
-    
-    @property
-    def last_message(self):
-        return self.messages.last()
 
 
 class Message(models.Model):
@@ -56,15 +97,19 @@ class Message(models.Model):
     )
     content = models.TextField()
     image = models.ImageField(upload_to='chat/images/', blank=True, null=True)
+    # WebP variants of image, built in the background by core.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     file = models.FileField(upload_to='chat/files/', blank=True, null=True)
-    is_read = models.BooleanField(default=False)
-    read_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'messages'
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a room's history on (created_at, id)
+            models.Index(fields=['chat_room', 'created_at', 'id']),
+        ]
         verbose_name = 'Message'
         verbose_name_plural = 'Messages'
     
@@ -72,31 +117,40 @@ class Message(models.Model):
         return f"{self.sender.get_full_name()}: {self.content[:50]}"
 
 
-class MessageReadStatus(models.Model):
+class ChatReadState(models.Model):
     """
-    Track read status per user in group chats
+    Read watermark of a user in a chat room: every message up to
+    last_read_at counts as read, so one row per participant covers the
+    whole history whatever the size of the group
     """
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    message = models.ForeignKey(
-        Message,
+    chat_room = models.ForeignKey(
+        ChatRoom,
         on_delete=models.CASCADE,
-        related_name='read_statuses'
+        related_name='read_states'
     )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='message_read_statuses'
+        related_name='chat_read_states'
+    )
+    last_read_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True
     )
-    read_at = models.DateTimeField(auto_now_add=True)
+    last_read_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        db_table = 'message_read_statuses'
-        unique_together = ['message', 'user']
-        verbose_name = 'Message Read Status'
-        verbose_name_plural = 'Message Read Statuses'
+        db_table = 'chat_read_states'
+        unique_together = ['chat_room', 'user']
+        verbose_name = 'Chat Read State'
+        verbose_name_plural = 'Chat Read States'
     
     def __str__(self):
-        return f"{self.user.get_full_name()} read message {self.message.id}"
+        return f"{self.user.get_full_name()} read {self.chat_room} up to {self.last_read_at}"
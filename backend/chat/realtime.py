@@ -0,0 +1,52 @@
+"""
+Real-time chat events
+Events are sent to the channel layer group of a room once the surrounding
+transaction commits; every ChatConsumer connected to the room relays them
+to its client
+"""
+import json
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from .serializers import MessageSerializer
+
+
+def room_group_name(room_id):
+    """Channel layer group of a chat room"""
+    return f'chat_{room_id}'
+
+
+def _group_send(room_id, event):
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(room_group_name(room_id), event)
+
+
+def broadcast(room_id, event_type, **payload):
+    """Send an event to the room after commit, so clients never see rolled back rows"""
+    # Channel layers only carry plain JSON types (no UUID or datetime)
+    event = {'type': event_type, **json.loads(json.dumps(payload, cls=DjangoJSONEncoder))}
+    transaction.on_commit(lambda: _group_send(room_id, event))
+
+
+def message_created(message):
+    """Push a new message to the room"""
+    broadcast(
+        message.chat_room_id,
+        'chat.message',
+        # A message nobody has read yet, so skip loading read watermarks
+        message=MessageSerializer(message, context={'read_watermarks': {}}).data
+    )
+
+
+def messages_read(chat_room_id, user, count):
+    """Push a read receipt for everything user has read in the room"""
+    broadcast(
+        chat_room_id,
+        'chat.read',
+        user_id=user.pk,
+        count=count,
+        read_at=timezone.now()
+    )
@@ -0,0 +1,9 @@
+"""
+WebSocket routing for chat app
+"""
+from django.urls import path
+from .consumers import ChatConsumer
+
+websocket_urlpatterns = [
+    path('ws/chat/<uuid:room_id>/', ChatConsumer.as_asgi()),
+]
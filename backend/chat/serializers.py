@@ -1,24 +1,66 @@
 """
 Serializers for chat app
 """
+from django.db import models
 from rest_framework import serializers
-from .models import ChatRoom, Message, MessageReadStatus
+from .models import ChatRoom, Message, ChatReadState
+from .services import create_direct_chat, get_direct_chat, unread_counts
 from accounts.serializers import UserSerializer
+from core.images import image_variant_urls
+
+
+def read_watermarks(room_ids):
+    """{room_id: [(user_id, last_read_at), ...]} for the given rooms"""
+    watermarks = {room_id: [] for room_id in room_ids}
+    states = ChatReadState.objects.filter(chat_room_id__in=room_ids)
+    for room_id, user_id, last_read_at in states.values_list('chat_room_id', 'user_id', 'last_read_at'):
+        watermarks[room_id].append((user_id, last_read_at))
+    return watermarks
+
+
+class MessagePageSerializer(serializers.ListSerializer):
+    """
+    List serializer for messages that loads the read watermarks of their
+    rooms once instead of once per message
+    """
+    
+    def to_representation(self, data):
+        messages = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context['read_watermarks'] = read_watermarks({message.chat_room_id for message in messages})
+        return super().to_representation(messages)
 
 
 class MessageSerializer(serializers.ModelSerializer):
     """
     Serializer for Message model
+    is_read: another participant has read up to this message
+    image_variants: {"thumbnail": url, "large": url} once built, else {}
     """
     sender = UserSerializer(read_only=True)
+    is_read = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
         fields = [
-            'id', 'chat_room', 'sender', 'content', 'image', 'file',
-            'is_read', 'read_at', 'created_at', 'updated_at'
+            'id', 'chat_room', 'sender', 'content', 'image', 'image_variants', 'file',
+            'is_read', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'sender', 'created_at', 'updated_at']
+        list_serializer_class = MessagePageSerializer
+    
+    def get_is_read(self, obj):
+        # Set by MessagePageSerializer when serializing a list
+        watermarks = self.context.get('read_watermarks')
+        if watermarks is None:
+            watermarks = read_watermarks([obj.chat_room_id])
+        return any(
+            user_id != obj.sender_id and last_read_at >= obj.created_at
+            for user_id, last_read_at in watermarks.get(obj.chat_room_id, ())
+        )
+    
+    def get_image_variants(self, obj):
+        return image_variant_urls(obj, self.context.get('request'))
 
 
 class MessageCreateSerializer(serializers.ModelSerializer):
@@ -35,9 +77,23 @@ class MessageCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class ChatRoomPageSerializer(serializers.ListSerializer):
+    """
+    List serializer for chat rooms that loads the read watermarks behind
+    the last messages' is_read once for the whole page
+    """
+    
+    def to_representation(self, data):
+        rooms = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context['read_watermarks'] = read_watermarks([room.id for room in rooms])
+        return super().to_representation(rooms)
+
+
 class ChatRoomSerializer(serializers.ModelSerializer):
     """
     Serializer for ChatRoom model
+    List with ChatRoomViewSet's queryset (participants prefetched, last
+    message joined, unread counts annotated) for a constant query count
     """
     participants = UserSerializer(many=True, read_only=True)
     last_message = MessageSerializer(read_only=True)
@@ -51,14 +107,15 @@ class ChatRoomSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = ChatRoomPageSerializer
     
     def get_unread_count(self, obj):
+        # Annotated by ChatRoomQuerySet.with_unread_count
+        if hasattr(obj, 'unread_count'):
+            return obj.unread_count
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return Message.objects.filter(
-                chat_room=obj,
-                is_read=False
-            ).exclude(sender=request.user).count()
+            return unread_counts(request.user, [obj]).get(obj.id, 0)
         return 0
 
 
@@ -77,6 +134,16 @@ class ChatRoomCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         participant_ids = validated_data.pop('participant_ids')
+        user = self.context['request'].user
+        
+        # A one-to-one room is the pair's direct chat, never a duplicate
+        other_ids = set(participant_ids) - {user.id}
+        if not validated_data.get('is_group') and len(other_ids) == 1:
+            from accounts.models import User
+            other_user = User.objects.filter(id=other_ids.pop()).first()
+            if other_user:
+                return get_direct_chat(user.id, other_user.id) or create_direct_chat(user, other_user)
+        
         chat_room = ChatRoom.objects.create(**validated_data)
         
         # Add creator as participant
@@ -93,14 +160,3 @@ class ChatRoomCreateSerializer(serializers.ModelSerializer):
         
         return chat_room
 
-
-class MessageReadStatusSerializer(serializers.ModelSerializer):
-    """
-    Serializer for MessageReadStatus model
-    """
-    user = UserSerializer(read_only=True)
-    
-    class Meta:
-        model = MessageReadStatus
-        fields = ['id', 'message', 'user', 'read_at', 'created_at']
-        read_only_fields = ['id', 'user', 'read_at', 'created_at']
@@ -0,0 +1,90 @@
+"""
+Services for chat app
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from .models import ChatReadState, ChatRoom, Message
+
+
+def mark_room_read(chat_room, user, up_to=None):
+    """
+    Move user's read watermark in a chat room up to a message (default:
+    the newest one)
+
+    Writes a single ChatReadState row however many messages and
+    participants the room has, and never moves the watermark back.
+    Returns the number of messages from others that became read.
+    """
+    if up_to is None:
+        up_to = Message.objects.filter(chat_room=chat_room).order_by('-created_at', '-id').first()
+        if up_to is None:
+            return 0
+
+    with transaction.atomic():
+        state, created = ChatReadState.objects.select_for_update().get_or_create(
+            chat_room=chat_room,
+            user=user,
+            defaults={'last_read_message': up_to, 'last_read_at': up_to.created_at}
+        )
+        if not created and state.last_read_at >= up_to.created_at:
+            return 0
+
+        newly_read = Message.objects.filter(
+            chat_room=chat_room,
+            created_at__lte=up_to.created_at
+        ).exclude(sender=user)
+        if not created:
+            newly_read = newly_read.filter(created_at__gt=state.last_read_at)
+            state.last_read_message = up_to
+            state.last_read_at = up_to.created_at
+            state.save(update_fields=['last_read_message', 'last_read_at', 'updated_at'])
+        return newly_read.count()
+
+
+def unread_counts(user, rooms=None):
+    """
+    Unread message count of each of user's chat rooms (or of the given
+    rooms), in one grouped query
+    """
+    queryset = ChatRoom.objects.filter(participants=user)
+    if rooms is not None:
+        queryset = queryset.filter(id__in=[room.id for room in rooms])
+    return dict(queryset.with_unread_count(user).order_by().values_list('id', 'unread_count'))
+
+
+def newest_message_id():
+    """Subquery for the id of the newest message of the outer chat room"""
+    return Subquery(
+        Message.objects.filter(chat_room=OuterRef('pk'))
+        .order_by('-created_at', '-id')
+        .values('id')[:1]
+    )
+
+
+def direct_chat_key(user_id, other_user_id):
+    """Canonical key of the direct chat between two users, whatever their order"""
+    first, second = sorted([str(user_id), str(other_user_id)])
+    return f'{first}:{second}'
+
+
+def get_direct_chat(user_id, other_user_id):
+    """Existing direct chat between two users (one unique index lookup), or None"""
+    key = direct_chat_key(user_id, other_user_id)
+    return ChatRoom.objects.filter(direct_key=key).first()
+
+
+def create_direct_chat(user, other_user):
+    """
+    Create the direct chat between two users, race-free
+
+    Of concurrent calls for the same pair only one INSERT passes the unique
+    direct_key; the others roll back and return the room it created.
+    """
+    key = direct_chat_key(user.id, other_user.id)
+    try:
+        with transaction.atomic():
+            chat_room = ChatRoom.objects.create(is_group=False, direct_key=key)
+            chat_room.participants.add(user, other_user)
+    except IntegrityError:
+        return ChatRoom.objects.get(direct_key=key)
+    return chat_room
@@ -0,0 +1,43 @@
+"""
+Signal handlers for chat app
+Keep ChatRoom.last_message pointing at the newest message of each room,
+and message image variants built
+"""
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from core.images import schedule_image_variants
+from .models import ChatRoom, Message
+from .services import newest_message_id
+
+
+@receiver(post_save, sender=Message)
+def set_room_last_message(sender, instance, created, raw=False, **kwargs):
+    """Point the room at a new message and move the room up the list"""
+    if not created or raw:
+        return
+    # Never replace a newer message saved concurrently
+    ChatRoom.objects.filter(
+        Q(last_message__isnull=True) | Q(last_message__created_at__lte=instance.created_at),
+        pk=instance.chat_room_id
+    ).update(last_message=instance, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Message)
+def build_message_image_variants(sender, instance, raw=False, **kwargs):
+    """Render the variants of a new or replaced message image in the background"""
+    if not raw:
+        schedule_image_variants(instance)
+
+
+@receiver(post_delete, sender=Message)
+def reset_room_last_message(sender, instance, origin=None, **kwargs):
+    """Fall back to the previous message, unless the room is being deleted"""
+    if isinstance(origin, ChatRoom) or getattr(origin, 'model', None) is ChatRoom:
+        return
+    # on_delete=SET_NULL has already cleared it if it was this message
+    ChatRoom.objects.filter(
+        pk=instance.chat_room_id,
+        last_message__isnull=True
+    ).update(last_message=newest_message_id())
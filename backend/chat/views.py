@@ -1,18 +1,20 @@
 """
 Views for chat app
 """
+import uuid
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.utils import timezone
-from django.db.models import Q
-from .models import ChatRoom, Message, MessageReadStatus
+from .models import ChatRoom, Message
+from accounts.models import User
+from core.pagination import MessageHistoryPagination, OldestFirstPagination
+from .realtime import message_created, messages_read
+from .services import create_direct_chat, get_direct_chat, mark_room_read, unread_counts
 from .serializers import (
     ChatRoomSerializer,
     ChatRoomCreateSerializer,
     MessageSerializer,
-    MessageCreateSerializer,
-    MessageReadStatusSerializer
+    MessageCreateSerializer
 )
 
 
@@ -31,13 +33,32 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Only return chat rooms where user is a participant
         user = self.request.user
-        return ChatRoom.objects.filter(participants=user)
+        queryset = ChatRoom.objects.filter(participants=user)
+        if self.action in ('list', 'retrieve'):
+            # Grouped queries drop Meta.ordering, so restate it
+            queryset = queryset.with_unread_count(user).order_by('-updated_at').select_related(
+                'last_message__sender'
+            ).prefetch_related('participants')
+        return queryset
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def unread_counts(self, request):
+        """
+        Get the unread message count of every chat room of the user
+        GET /api/v1/chat-rooms/unread_counts/
+        """
+        counts = unread_counts(request.user)
+        return Response({
+            'total': sum(counts.values()),
+            'rooms': {str(room_id): count for room_id, count in counts.items()},
+        }, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def messages(self, request, pk=None):
         """
-        Get all messages in a chat room
-        GET /api/v1/chat-rooms/{id}/messages/
+        Get the messages of a chat room, newest first, paginated by cursor
+        GET /api/v1/chat-rooms/{id}/messages/?cursor=...
+        GET /api/v1/chat-rooms/{id}/messages/?since=... (only newer messages, oldest first)
         """
         chat_room = self.get_object()
         
@@ -47,9 +68,14 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
                 'error': 'You are not a participant in this chat room.'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        messages = chat_room.messages.all()
+        paginator = MessageHistoryPagination()
+        messages = paginator.paginate_queryset(
+            chat_room.messages.select_related('sender'),
+            request,
+            view=self
+        )
         serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def send_message(self, request, pk=None):
@@ -65,17 +91,20 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
                 'error': 'You are not a participant in this chat room.'
             }, status=status.HTTP_403_FORBIDDEN)
         
+        # Multipart bodies (image/file uploads) arrive as a QueryDict, whose
+        # ** unpacking would yield lists; dict() takes the single values
+        data = request.data.dict() if hasattr(request.data, 'dict') else dict(request.data)
         serializer = MessageCreateSerializer(
-            data={'chat_room': chat_room.id, **request.data},
+            data={**data, 'chat_room': chat_room.id},
             context={'request': request}
         )
         
         if serializer.is_valid():
+            # Also moves the room's last_message and updated_at (chat.signals)
             message = serializer.save()
             
-            # Update chat room's updated_at timestamp
-            chat_room.updated_at = timezone.now()
-            chat_room.save()
+            # Connected participants get it over their WebSocket
+            message_created(message)
             
             return Response(
                 MessageSerializer(message).data,
@@ -99,25 +128,12 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
                 'error': 'You are not a participant in this chat room.'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        # Mark all unread messages as read
-        unread_messages = Message.objects.filter(
-            chat_room=chat_room,
-            is_read=False
-        ).exclude(sender=user)
-        
-        for message in unread_messages:
-            message.is_read = True
-            message.read_at = timezone.now()
-            message.save()
-            
-            # Create read status
-            MessageReadStatus.objects.get_or_create(
-                message=message,
-                user=user
-            )
+        count = mark_room_read(chat_room, user)
+        if count:
+            messages_read(chat_room.id, user, count)
         
         return Response({
-            'message': f'{unread_messages.count()} messages marked as read.'
+            'message': f'{count} messages marked as read.'
         }, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -135,28 +151,30 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
                 'error': 'user_id is required.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Find existing direct chat
-        chat_rooms = ChatRoom.objects.filter(
-            participants=user,
-            is_group=False
-        ).filter(participants__id=other_user_id)
-        
-        if chat_rooms.exists():
-            chat_room = chat_rooms.first()
-        else:
-            # Create new direct chat
-            chat_room = ChatRoom.objects.create(is_group=False)
-            chat_room.participants.add(user)
-            
-            from accounts.models import User
+        try:
+            other_user_id = uuid.UUID(str(other_user_id))
+        except ValueError:
+            return Response({
+                'error': 'User not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        if other_user_id == user.id:
+            return Response({
+                'error': 'You cannot start a direct chat with yourself.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Find existing direct chat by its unique key
+        chat_room = get_direct_chat(user.id, other_user_id)
+        
+        if chat_room is None:
             try:
                 other_user = User.objects.get(id=other_user_id)
-                chat_room.participants.add(other_user)
             except User.DoesNotExist:
-                chat_room.delete()
                 return Response({
                     'error': 'User not found.'
                 }, status=status.HTTP_404_NOT_FOUND)
+            
+            chat_room = create_direct_chat(user, other_user)
         
         serializer = ChatRoomSerializer(chat_room, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -168,6 +186,7 @@ class MessageViewSet(viewsets.ModelViewSet):
     """
     queryset = Message.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OldestFirstPagination
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -179,6 +198,10 @@ class MessageViewSet(viewsets.ModelViewSet):
         user = self.request.user
         return Message.objects.filter(chat_room__participants=user)
     
+    def perform_create(self, serializer):
+        message = serializer.save()
+        message_created(message)
+    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def mark_as_read(self, request, pk=None):
         """
@@ -200,16 +223,10 @@ class MessageViewSet(viewsets.ModelViewSet):
                 'error': 'You cannot mark your own message as read.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        if not message.is_read:
-            message.is_read = True
-            message.read_at = timezone.now()
-            message.save()
-            
-            # Create read status
-            MessageReadStatus.objects.get_or_create(
-                message=message,
-                user=user
-            )
+        # Everything up to this message counts as read
+        count = mark_room_read(message.chat_room, user, up_to=message)
+        if count:
+            messages_read(message.chat_room_id, user, count)
         
         return Response({
             'message': 'Message marked as read.'
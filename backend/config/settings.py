@@ -136,6 +136,23 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are streamed in chunks (to a temporary file above
+# FILE_UPLOAD_MAX_MEMORY_SIZE) and refused with 413 as soon as a request
+# declares or streams more than MAX_UPLOAD_SIZE bytes
+MAX_UPLOAD_SIZE = config('MAX_UPLOAD_SIZE', default=20 * 1024 * 1024, cast=int)
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.SizeLimitUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Threads rendering post/message image variants after upload; 0 renders
+# them inline, which tests and scripts can rely on
+IMAGE_VARIANT_WORKERS = config('IMAGE_VARIANT_WORKERS', default=2, cast=int)
+
+# Rendered ticket QR images (regenerated on demand, safe to delete)
+TICKET_QR_CACHE_DIR = config('TICKET_QR_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'tickets'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -158,6 +175,8 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
     ),
+    # Oversized uploads (core.uploads.SizeLimitUploadHandler) -> 413
+    'EXCEPTION_HANDLER': 'core.uploads.exception_handler',
 }
 
 
@@ -196,11 +215,52 @@ CORS_ALLOW_CREDENTIALS = True
 
 
 # Channels Configuration
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+# Redis is required as soon as more than one ASGI worker serves WebSockets;
+# without CHANNEL_REDIS_URL the in-process layer is used (tests, development)
+CHANNEL_REDIS_URL = config('CHANNEL_REDIS_URL', default='')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [CHANNEL_REDIS_URL],
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer'
+        }
     }
-}
+
+# Cache (unread notification counters)
+# Shared by all processes with CACHE_REDIS_URL; otherwise each process keeps
+# its own in-memory cache (tests, development)
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Timeline counters: 0 updates Post.likes_count/comments_count in place;
+# N > 0 spreads the writes over N shard rows per post for viral posts,
+# folded onto the post by the fold_post_counters command
+TIMELINE_COUNTER_SHARDS = config('TIMELINE_COUNTER_SHARDS', default=0, cast=int)
+
+# Materialized home feed: a Redis URL, 'memory://' for the in-process
+# stand-in (tests, single process), or empty to always read the database
+TIMELINE_FEED_URL = config('TIMELINE_FEED_URL', default='')
+TIMELINE_FEED_DEPTH = config('TIMELINE_FEED_DEPTH', default=500, cast=int)
 
 # Stripe configuration (set these in your environment or .env)
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default=None)
@@ -219,6 +279,26 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Focus Health Academy <noreply@focushealthacademy.com>')
 
+# Email outbox: requests only queue emails. Background threads in each
+# process send them after commit (0 leaves it to `manage.py send_outbox
+# --loop`), in batches over one SMTP connection, retrying failures after
+# RETRY_DELAY seconds, doubling up to MAX_RETRY_DELAY, for MAX_ATTEMPTS
+EMAIL_OUTBOX_THREADS = config('EMAIL_OUTBOX_THREADS', default=1, cast=int)
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=100, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)
+EMAIL_OUTBOX_MAX_RETRY_DELAY = config('EMAIL_OUTBOX_MAX_RETRY_DELAY', default=3600, cast=int)
+
+# Rows per INSERT when an announcement fans out to its audience
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=5000, cast=int)
+# Seconds a cached unread count lives before it is recounted; the
+# reconcile_notification_counts command corrects drift in between
+NOTIFICATION_UNREAD_COUNT_TIMEOUT = config('NOTIFICATION_UNREAD_COUNT_TIMEOUT', default=86400, cast=int)
+# Likes and comments on a post within one window of this many seconds
+# update a single notification ("X and 49 others liked your post");
+# 0 creates one notification per like or comment
+NOTIFICATION_COALESCE_WINDOW = config('NOTIFICATION_COALESCE_WINDOW', default=3600, cast=int)
+
 # Production Security Settings
 if not DEBUG:
     # HTTPS/SSL
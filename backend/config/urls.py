@@ -8,6 +8,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.views import ticket_qr_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -18,6 +19,7 @@ urlpatterns = [
     path('api/v1/', include('chat.urls')),
     path('api/v1/payments/', include('payments.urls')),
     path('api/v1/notifications/', include('notifications.urls')),
+    path('api/v1/tickets/<str:token>/qr.png', ticket_qr_view, name='ticket-qr'),
 ]
 
 # Serve media files in development
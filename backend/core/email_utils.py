@@ -1,45 +1,106 @@
 """
 Email utility functions for sending emails with templates
+Templates are compiled once per process (warmed at startup by the
+notifications app) and rendered against a shared branding context, so
+one template can be rendered for thousands of recipients cheaply
 """
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from pathlib import Path
+
 from django.conf import settings
+from django.template import Context, engines
+from notifications.outbox import enqueue_email
+
+# Compiled django.template.base.Template objects by email template name
+_templates = {}
+
+
+def branding_context():
+    """App branding available to every email template"""
+    return {
+        'app_name': 'Focus Health Academy',
+        'app_url': settings.FRONTEND_DOMAIN or 'http://localhost:19006',
+        'primary_color': '#2563EB',
+        'secondary_color': '#10B981',
+    }
+
+
+def email_template_names():
+    """Names (without .html) of the templates in the emails/ template directories"""
+    names = set()
+    for directory in engines['django'].engine.dirs:
+        names.update(path.stem for path in Path(directory, 'emails').glob('*.html'))
+    return sorted(names)
+
+
+def get_email_template(template_name):
+    """Compiled template of an email, loaded and parsed once per process"""
+    template = _templates.get(template_name)
+    if template is None:
+        template = engines['django'].get_template(f'emails/{template_name}.html').template
+        _templates[template_name] = template
+    return template
+
+
+def warm_email_templates():
+    """
+    Compile every email template, including the base they extend, so the
+    first emails after a deploy do not pay for parsing
+    """
+    names = email_template_names()
+    for name in names:
+        get_email_template(name)
+    return names
+
+
+def render_emails(template_name, contexts):
+    """
+    Render one email template for many recipients
+    
+    The template is compiled once and the branding context is built once;
+    each recipient's context is only layered on top for its own render.
+    
+    Args:
+        template_name: Name of the template file (without .html)
+        contexts: Iterable of per-recipient context dictionaries
+    
+    Yields:
+        Rendered HTML, one per context, in order
+    """
+    template = get_email_template(template_name)
+    context = Context(branding_context(), autoescape=template.engine.autoescape)
+    for recipient_context in contexts:
+        with context.push(recipient_context):
+            yield template.render(context)
+
+
+def render_email(template_name, context):
+    """Render an email template for a single recipient"""
+    return next(render_emails(template_name, [context]))
 
 
 def send_email(subject, to_email, template_name, context):
     """
-    Send an email using HTML template
+    Queue an email using HTML template
+    
+    The email is rendered now and stored in the outbox; it is sent after
+    the current transaction commits, off the request path, with retries
+    (see notifications.outbox)
     
     Args:
         subject: Email subject
         to_email: Recipient email address (string or list)
         template_name: Name of the template file (without .html)
         context: Dictionary of context variables for the template
-    """
-    # Add app branding to context
-    context.update({
-        'app_name': 'Focus Health Academy',
-        'app_url': settings.FRONTEND_DOMAIN or 'http://localhost:19006',
-        'primary_color': '#2563EB',
-        'secondary_color': '#10B981',
-    })
     
-    # Render HTML content
-    html_content = render_to_string(f'emails/{template_name}.html', context)
+    Returns:
+        True once the email is queued
+    """
+    # Render HTML content (with app branding)
+    html_content = render_email(template_name, context)
     
-    # Create email
-    email = EmailMultiAlternatives(
+    enqueue_email(
         subject=subject,
-        body='',  # Plain text fallback (optional)
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[to_email] if isinstance(to_email, str) else to_email
+        to=[to_email] if isinstance(to_email, str) else list(to_email),
+        html_body=html_content
     )
-    
-    email.attach_alternative(html_content, "text/html")
-    
-    try:
-        email.send()
-        return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        return False
+    return True
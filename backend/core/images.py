@@ -0,0 +1,134 @@
+"""
+Image variants for post and chat message images
+Resized WebP copies are rendered off the request path, in a thread pool
+once the upload has committed, and recorded on the row together with the
+name of the image they were made from, so list views can serve a small
+variant instead of the full-resolution upload
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels of each variant; all are encoded as WebP
+VARIANTS = {
+    'thumbnail': 480,
+    'large': 2048,
+}
+WEBP_QUALITY = 80
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_name(name, variant):
+    """Storage name of an image variant, e.g. variants/posts/a.thumbnail.webp"""
+    root, _ = os.path.splitext(name)
+    return f'variants/{root}.{variant}.webp'
+
+
+def variants_are_stale(instance, field='image', variants_field='image_variants'):
+    """Whether instance has an image whose variants are missing or outdated"""
+    image = getattr(instance, field)
+    return bool(image) and (getattr(instance, variants_field) or {}).get('source') != image.name
+
+
+def render_variants(source):
+    """Encode every variant of an image file; returns {variant: bytes}"""
+    rendered = {}
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        for variant, size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size))
+            buffer = BytesIO()
+            resized.save(buffer, 'WEBP', quality=WEBP_QUALITY)
+            rendered[variant] = buffer.getvalue()
+    return rendered
+
+
+def build_image_variants(model, pk, field='image', variants_field='image_variants'):
+    """Render and store the variants of a row's image, then record them on the row"""
+    instance = model.objects.filter(pk=pk).only(field, variants_field).first()
+    if instance is None or not variants_are_stale(instance, field, variants_field):
+        return
+
+    image = getattr(instance, field)
+    with image.open('rb'):
+        rendered = render_variants(image)
+
+    variants = {'source': image.name}
+    for variant, content in rendered.items():
+        variants[variant] = image.storage.save(variant_name(image.name, variant), ContentFile(content))
+
+    # A replaced image gets its own job; do not record stale variants for it
+    model.objects.filter(pk=pk, **{field: image.name}).update(**{variants_field: variants})
+
+
+def _build(model, pk, field, variants_field):
+    try:
+        build_image_variants(model, pk, field, variants_field)
+    except Exception:
+        logger.exception('Could not build image variants of %s %s', model.__name__, pk)
+
+
+def _build_in_worker(model, pk, field, variants_field):
+    try:
+        _build(model, pk, field, variants_field)
+    finally:
+        # Connections are per thread; do not leave the worker's open
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                thread_name_prefix='image-variants'
+            )
+        return _executor
+
+
+def schedule_image_variants(instance, field='image', variants_field='image_variants'):
+    """
+    Build the variants of instance's image after the current transaction
+    commits, unless they are up to date. With IMAGE_VARIANT_WORKERS = 0
+    they are built inline (tests, management commands).
+    """
+    if not variants_are_stale(instance, field, variants_field):
+        return
+    model, pk = type(instance), instance.pk
+
+    def submit():
+        if settings.IMAGE_VARIANT_WORKERS > 0:
+            _get_executor().submit(_build_in_worker, model, pk, field, variants_field)
+        else:
+            _build(model, pk, field, variants_field)
+
+    transaction.on_commit(submit)
+
+
+def image_variant_urls(instance, request=None, field='image', variants_field='image_variants'):
+    """URLs of the variants of instance's current image; {} until they are built"""
+    if variants_are_stale(instance, field, variants_field) or not getattr(instance, field):
+        return {}
+    image = getattr(instance, field)
+    variants = getattr(instance, variants_field)
+    urls = {}
+    for variant in VARIANTS:
+        if variant in variants:
+            url = image.storage.url(variants[variant])
+            urls[variant] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,219 @@
+"""
+Keyset (cursor) pagination shared by the timeline and chat apps
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class Row(Func):
+    """SQL row value, so (a, b) < (x, y) compares element by element"""
+    template = '(%(expressions)s)'
+    output_field = models.Field()
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate on a unique, uniformly ordered key such as (created_at, id)
+
+    Each page starts strictly after the last row of the previous one with
+    a row-value comparison that the matching composite index can seek to,
+    so deep pages cost the same as the first and rows inserted while a
+    client scrolls never shift or repeat items. No COUNT(*) is run.
+
+    Response: {"next": <url or null>, "results": [...]}
+    """
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        return self._paginate(queryset, request.query_params.get(self.cursor_query_param))
+
+    def paginate_first_page(self, queryset, base_url, page_size):
+        """
+        First page of queryset for embedding in another response; the next
+        link continues on base_url (the endpoint that lists the rest)
+        """
+        self.base_url = base_url
+        self.page_size = page_size
+        return self._paginate(queryset, None)
+
+    def paginate_prefetched(self, rows, has_next, request):
+        """
+        Page from rows already loaded in this ordering (e.g. hydrated from
+        a materialized feed); the next link continues with the database
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.has_next = has_next
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def _paginate(self, queryset, cursor):
+        fields = [name.lstrip('-') for name in self.ordering]
+        queryset = queryset.order_by(*self.ordering)
+
+        if cursor:
+            position = self.decode_cursor(queryset.model, fields, cursor)
+            queryset = queryset.filter(self.after(queryset.model, fields, position))
+
+        # One extra row tells whether there is a next page
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def after(self, model, fields, position):
+        """Filter for the rows that come after a cursor position"""
+        lookup = LessThan if self.ordering[0].startswith('-') else GreaterThan
+        return lookup(
+            Row(*[F(name) for name in fields]),
+            Row(*[
+                Value(value, output_field=model._meta.get_field(name))
+                for name, value in zip(fields, position)
+            ])
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, model, fields, item):
+        values = [model._meta.get_field(name).value_to_string(item) for name in fields]
+        return urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, model, fields, cursor):
+        try:
+            values = json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [model._meta.get_field(name).to_python(value) for name, value in zip(fields, values)]
+        except (Base64Error, ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        fields = [name.lstrip('-') for name in self.ordering]
+        cursor = self.encode_cursor(type(last), fields, last)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+
+class NewestFirstPagination(KeysetPagination):
+    """Newest rows first, e.g. the timeline feed"""
+    ordering = ('-created_at', '-id')
+
+
+class OldestFirstPagination(KeysetPagination):
+    """Oldest rows first, e.g. comments and chat messages"""
+    ordering = ('created_at', 'id')
+
+
+class MessageHistoryPagination(NewestFirstPagination):
+    """
+    Newest-first history with an incremental sync mode, e.g. chat rooms
+
+    ?since=<cursor> returns only the rows newer than the cursor, oldest
+    first. Every response carries a `sync` link that returns whatever
+    arrives after the newest row the client has seen, so reopening a
+    conversation transfers only the new rows.
+
+    Response: {"next": <url or null>, "sync": <url or null>, "results": [...]}
+    """
+    since_query_param = 'since'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.since = request.query_params.get(self.since_query_param)
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.since:
+            # Walk forward from the client's newest row instead
+            self.ordering = tuple(
+                name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering
+            )
+            self.cursor_query_param = self.since_query_param
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_sync_link(self):
+        if self.since:
+            newest = self.page[-1] if self.page else None
+        elif not self.cursor:
+            newest = self.page[0] if self.page else None
+        else:
+            # Older history pages do not move the sync point
+            return None
+
+        if newest is None:
+            since = self.since
+        else:
+            fields = [name.lstrip('-') for name in self.ordering]
+            since = self.encode_cursor(type(newest), fields, newest)
+        if not since:
+            return None
+        url = remove_query_param(self.base_url, 'cursor')
+        return replace_query_param(url, self.since_query_param, since)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'sync': self.get_sync_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['sync'] = {
+            'type': 'string',
+            'nullable': True,
+            'format': 'uri',
+        }
+        return response_schema
@@ -0,0 +1,143 @@
+"""
+Tickets for in-person enrollments and event registrations
+A ticket is a compact HMAC-signed token. QR images are rendered on demand
+from it and cached in memory and on disk, so nothing is encoded on the
+payment path, and door check-in verifies it before touching the database
+"""
+import base64
+import binascii
+import hashlib
+import io
+import os
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+import qrcode
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+# Bump when the rendering parameters change to invalidate cached images
+RENDER_VERSION = '2'
+
+# One-letter ticket kind prefix for each ticketed model
+TICKET_KINDS = {
+    'enrollment': 'C',
+    'eventregistration': 'E',
+}
+_MODELS_BY_KIND = {kind: model_name for model_name, kind in TICKET_KINDS.items()}
+
+# Truncated HMAC-SHA256; forging a ticket still needs the secret key
+MAC_BYTES = 8
+
+# Kind letter + base32 of (16-byte UUID + MAC), padding stripped. Upper-case
+# base32 fits the QR alphanumeric mode, which keeps the code small.
+TOKEN_LENGTH = 1 + len(base64.b32encode(bytes(16 + MAC_BYTES)).rstrip(b'='))
+
+
+def _mac(kind, raw):
+    return salted_hmac('tickets', kind.encode() + raw).digest()[:MAC_BYTES]
+
+
+def ticket_token(model_name, object_id):
+    """Signed token for a ticketed model name and UUID primary key"""
+    kind = TICKET_KINDS[model_name]
+    raw = object_id.bytes
+    return kind + base64.b32encode(raw + _mac(kind, raw)).decode().rstrip('=')
+
+
+def make_ticket_token(obj):
+    """Signed token identifying an Enrollment or EventRegistration"""
+    return ticket_token(obj._meta.model_name, obj.pk)
+
+
+def read_ticket_token(token):
+    """
+    Verify a ticket token without touching the database
+
+    Returns:
+        Tuple of (model_name, object_id), or None for a forged token
+    """
+    if not isinstance(token, str) or len(token) != TOKEN_LENGTH:
+        return None
+    kind, body = token[0], token[1:]
+    if kind not in _MODELS_BY_KIND:
+        return None
+    try:
+        data = base64.b32decode(body + '=' * (-len(body) % 8))
+    except (binascii.Error, ValueError):
+        return None
+    raw, mac = data[:16], data[16:]
+    if not constant_time_compare(mac, _mac(kind, raw)):
+        return None
+    return _MODELS_BY_KIND[kind], uuid.UUID(bytes=raw)
+
+
+def check_in_ticket(queryset, object_id, fields):
+    """
+    Mark a ticket attended and read back a minimal payload
+
+    The check-in is one conditional UPDATE on the primary key, so scanning
+    the same ticket twice does not write again.
+
+    Args:
+        queryset: Valid tickets (e.g. non-cancelled registrations)
+        object_id: Primary key from read_ticket_token
+        fields: Fields to return, as for QuerySet.values()
+
+    Returns:
+        Tuple of (row, checked_in); row is None when no valid ticket matches
+    """
+    checked_in = queryset.filter(pk=object_id, attended=False).update(
+        attended=True,
+        updated_at=timezone.now()
+    ) == 1
+    row = queryset.filter(pk=object_id).values(*fields).first()
+    return row, checked_in
+
+
+def ticket_qr_url(obj, request=None):
+    """URL of the QR image for a ticket (absolute when a request is given)"""
+    url = reverse('ticket-qr', args=[make_ticket_token(obj)])
+    return request.build_absolute_uri(url) if request else url
+
+
+def ticket_etag(token):
+    """Stable ETag for the rendered image of a token"""
+    return hashlib.sha256(f'{RENDER_VERSION}:{token}'.encode()).hexdigest()[:32]
+
+
+@lru_cache(maxsize=1024)
+def render_ticket_qr(token):
+    """
+    Return the PNG bytes of the QR code for a token
+
+    Served from the in-process LRU cache, then the on-disk cache, and
+    rendered with qrcode only on a miss.
+    """
+    cache_dir = Path(settings.TICKET_QR_CACHE_DIR)
+    path = cache_dir / f'{ticket_etag(token)}.png'
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+
+    qr = qrcode.QRCode(box_size=10, border=4)
+    qr.add_data(token)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    png = buffer.getvalue()
+
+    # Write through a temporary file so readers never see a partial image
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_bytes(png)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return png
@@ -0,0 +1,56 @@
+"""
+Upload handling shared by the timeline and chat apps
+Multipart bodies are streamed in chunks (to memory for small files, to a
+temporary file above FILE_UPLOAD_MAX_MEMORY_SIZE) and size limits are
+enforced while streaming, so an oversized upload is refused before it
+occupies a worker or reaches storage
+"""
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload too large.'
+    default_code = 'upload_too_large'
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """
+    First upload handler: rejects requests whose Content-Length exceeds
+    MAX_UPLOAD_SIZE before reading the body, and files that pass it while
+    streaming (chunked requests declare no length); otherwise hands every
+    chunk on to the next handler unchanged
+
+    It runs for every request, so it raises Django's RequestDataTooBig
+    (a 400 outside the API, e.g. in the admin); exception_handler turns
+    it into a 413 for API views
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.max_size = settings.MAX_UPLOAD_SIZE
+        if content_length > self.max_size:
+            raise self.too_large()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            raise self.too_large()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+    def too_large(self):
+        return RequestDataTooBig(f'Uploads are limited to {filesizeformat(self.max_size)}.')
+
+
+def exception_handler(exc, context):
+    """DRF exception handler answering oversized uploads with a JSON 413"""
+    if isinstance(exc, RequestDataTooBig):
+        exc = UploadTooLarge(str(exc))
+    return drf_exception_handler(exc, context)
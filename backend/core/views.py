@@ -0,0 +1,28 @@
+"""
+Views for shared ticket rendering
+"""
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import etag, require_GET
+from .tickets import read_ticket_token, render_ticket_qr, ticket_etag
+
+
+def _ticket_etag(request, token):
+    # Forged tokens get no ETag so they always fall through to the 404
+    return ticket_etag(token) if read_ticket_token(token) else None
+
+
+@require_GET
+@etag(_ticket_etag)
+def ticket_qr_view(request, token):
+    """
+    Serve the QR image for a ticket token
+    GET /api/v1/tickets/{token}/qr.png
+    """
+    if read_ticket_token(token) is None:
+        raise Http404('Invalid ticket.')
+
+    response = HttpResponse(render_ticket_qr(token), content_type='image/png')
+    # The image for a token never changes
+    patch_cache_control(response, private=True, max_age=31536000, immutable=True)
+    return response
@@ -44,8 +44,8 @@ class EnrollmentAdmin(admin.ModelAdmin):
     """
     Admin interface for Enrollment model
     """
-    list_display = ['student', 'course', 'progress_percentage', 'is_active', 'enrolled_at']
-    list_filter = ['is_active', 'enrolled_at', 'completed_at']
+    list_display = ['student', 'course', 'progress_percentage', 'is_active', 'attended', 'enrolled_at']
+    list_filter = ['is_active', 'attended', 'enrolled_at', 'completed_at']
     search_fields = ['student__email', 'course__title']
     ordering = ['-enrolled_at']
 
@@ -0,0 +1,76 @@
+"""
+Management command to benchmark enrollment provisioning against course size
+"""
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from accounts.models import User
+from courses.models import Course, Lesson
+from courses.services import provision_enrollment
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data"""
+
+
+class Command(BaseCommand):
+    help = 'Measure enrollment latency and query count for growing lesson counts (all data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lessons',
+            type=int,
+            nargs='+',
+            default=[10, 50, 200, 500],
+            help='Lesson counts to benchmark',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Enrollments per lesson count',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"lessons":>8} {"queries":>8} {"avg ms":>8} {"max ms":>8}')
+        try:
+            with transaction.atomic():
+                teacher = self._user('teacher')
+                for lesson_count in options['lessons']:
+                    self._run(teacher, lesson_count, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _user(self, prefix):
+        suffix = uuid.uuid4().hex[:12]
+        return User.objects.create(
+            username=f'bench-{prefix}-{suffix}',
+            email=f'bench-{prefix}-{suffix}@example.com',
+        )
+
+    def _run(self, teacher, lesson_count, repeat):
+        course = Course.objects.create(
+            title=f'Benchmark course ({lesson_count} lessons)',
+            description='Benchmark',
+            teacher=teacher,
+        )
+        Lesson.objects.bulk_create([
+            Lesson(course=course, title=f'Lesson {order}', order=order)
+            for order in range(lesson_count)
+        ])
+        students = [self._user('student') for _ in range(repeat)]
+
+        timings = []
+        for student in students:
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                provision_enrollment(student, course)
+                timings.append((time.perf_counter() - start) * 1000)
+
+        self.stdout.write(
+            f'{lesson_count:>8} {len(queries.captured_queries):>8} '
+            f'{sum(timings) / len(timings):>8.2f} {max(timings):>8.2f}'
+        )
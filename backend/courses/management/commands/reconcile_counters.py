@@ -0,0 +1,76 @@
+"""
+Management command to reconcile denormalized enrollment, lesson, registration
+and post counters
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from courses.models import Course, Enrollment, Lesson, LessonProgress
+from courses.services import progress_expression
+from events.models import Event, EventRegistration
+from timeline.models import Comment, Like, Post
+from timeline.services import fold_post_counter_shards
+
+
+def _active_count(queryset, field, outer='pk'):
+    """Correlated subquery counting rows that point at the outer object"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef(outer)})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Course.enrolled_count, Enrollment lesson counters, '
+        'Event.registered_count and Post like/comment counts where they have drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted rows, do not fix them',
+        )
+
+    def handle(self, *args, **options):
+        # Pending sharded deltas would otherwise be counted twice
+        if not options['dry_run']:
+            folded = fold_post_counter_shards()
+            self.stdout.write(f'  ✓ post counter shards: {folded} posts folded')
+
+        # Order matters: progress_percentage is derived from the lesson counters
+        targets = [
+            (Course, 'enrolled_count', _active_count(Enrollment.objects.filter(is_active=True), 'course')),
+            (Enrollment, 'total_lessons', _active_count(Lesson.objects.all(), 'course', outer='course')),
+            (Enrollment, 'completed_lessons', _active_count(LessonProgress.objects.filter(is_completed=True), 'enrollment')),
+            (Enrollment, 'progress_percentage', progress_expression(F('completed_lessons'), F('total_lessons'))),
+            (Event, 'registered_count', _active_count(EventRegistration.objects.filter(is_cancelled=False), 'event')),
+            (Post, 'likes_count', _active_count(Like.objects.all(), 'post')),
+            (Post, 'comments_count', _active_count(Comment.objects.all(), 'post')),
+        ]
+
+        for model, counter, actual in targets:
+            label = f'{model._meta.verbose_name_plural}.{counter}'
+            drifted = model.objects.annotate(actual=actual).exclude(**{counter: F('actual')})
+            count = drifted.count()
+
+            if not count:
+                self.stdout.write(f'  ✓ {label}: no drift')
+                continue
+
+            if options['dry_run']:
+                self.stdout.write(self.style.WARNING(f'  ! {label}: {count} drifted'))
+                continue
+
+            # One UPDATE per counter, recomputing only the drifted rows
+            fixed = model.objects.filter(
+                pk__in=drifted.values('pk')
+            ).update(**{counter: actual})
+            self.stdout.write(self.style.SUCCESS(f'  ✓ {label}: {fixed} reconciled'))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_enrolled_count(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    active = Enrollment.objects.filter(
+        course=OuterRef('pk'), is_active=True
+    ).order_by().values('course').annotate(total=Count('pk')).values('total')
+    Course.objects.update(enrolled_count=Coalesce(Subquery(active), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_lesson_content_type_alter_lesson_pdf_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Active enrollments, maintained by courses.signals'),
+        ),
+        migrations.RunPython(backfill_enrolled_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_lesson_counters(apps, schema_editor):
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    Lesson = apps.get_model('courses', 'Lesson')
+    LessonProgress = apps.get_model('courses', 'LessonProgress')
+    total = Lesson.objects.filter(
+        course=OuterRef('course')
+    ).order_by().values('course').annotate(total=Count('pk')).values('total')
+    completed = LessonProgress.objects.filter(
+        enrollment=OuterRef('pk'), is_completed=True
+    ).order_by().values('enrollment').annotate(total=Count('pk')).values('total')
+    Enrollment.objects.update(
+        total_lessons=Coalesce(Subquery(total), 0),
+        completed_lessons=Coalesce(Subquery(completed), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_enrolled_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Completed lessons, maintained by courses.services.complete_lesson'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='total_lessons',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Lessons in the course, maintained by courses.signals'),
+        ),
+        migrations.RunPython(backfill_lesson_counters, migrations.RunPython.noop),
+    ]
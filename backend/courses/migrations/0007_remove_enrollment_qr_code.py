@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_enrollment_lesson_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='enrollment',
+            name='qr_code',
+        ),
+    ]
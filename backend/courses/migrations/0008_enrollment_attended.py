@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_remove_enrollment_qr_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='attended',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -6,6 +6,25 @@ from django.db import models
 from django.conf import settings
 
 
+class CourseFullError(Exception):
+    """
+    Raised when a capacity-enforced enrollment cannot claim a seat
+    """
+
+
+class CourseQuerySet(models.QuerySet):
+    """
+    QuerySet helpers for Course
+    """
+    
+    def for_catalog(self):
+        """
+        Catalog query mode: join the teacher so list pages do not fetch it
+        once per course (enrollment counts are stored on the row itself)
+        """
+        return self.select_related('teacher')
+
+
 class Course(models.Model):
     """
     Course model for online and in-person courses
@@ -45,9 +64,16 @@ class Course(models.Model):
     is_published = models.BooleanField(default=False)
     duration_weeks = models.IntegerField(default=0, help_text='Course duration in weeks')
     max_students = models.IntegerField(default=0, help_text='0 means unlimited')
+    enrolled_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Active enrollments, maintained by courses.signals'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CourseQuerySet.as_manager()
+    
     class Meta:
         db_table = 'courses'
         ordering = ['-created_at']
@@ -57,10 +83,6 @@ class Course(models.Model):
     def __str__(self):
         return self.title
     
-    @property
-    def enrolled_count(self):
-        return self.enrollments.filter(is_active=True).count()
-    
     @property
     def is_full(self):
         if self.max_students == 0:
@@ -116,7 +138,18 @@ class Enrollment(models.Model):
     )
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
     is_active = models.BooleanField(default=True)
+    attended = models.BooleanField(default=False)
     progress_percentage = models.IntegerField(default=0)
+    completed_lessons = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Completed lessons, maintained by courses.services.complete_lesson'
+    )
+    total_lessons = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Lessons in the course, maintained by courses.signals'
+    )
     enrolled_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(blank=True, null=True)
     # Payment fields
@@ -124,10 +157,14 @@ class Enrollment(models.Model):
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     currency = models.CharField(max_length=10, default='EUR')
     payment_reference = models.CharField(max_length=255, blank=True, null=True)
-    qr_code = models.TextField(blank=True, null=True, help_text='Base64 PNG for in-person enrollments')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Set to True before saving to claim a seat with a conditional UPDATE;
+    # the save must run inside transaction.atomic() so a full course
+    # (CourseFullError) rolls the enrollment back.
+    enforce_capacity = False
+    
     class Meta:
         db_table = 'enrollments'
         ordering = ['-enrolled_at']
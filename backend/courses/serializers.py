@@ -4,6 +4,7 @@ Serializers for courses app
 from rest_framework import serializers
 from .models import Course, Lesson, Enrollment, LessonProgress
 from accounts.serializers import UserSerializer
+from core.tickets import ticket_qr_url
 
 
 class LessonSerializer(serializers.ModelSerializer):
@@ -82,18 +83,25 @@ class EnrollmentSerializer(serializers.ModelSerializer):
     student = UserSerializer(read_only=True)
     course = CourseListSerializer(read_only=True)
     lesson_progress = LessonProgressSerializer(many=True, read_only=True)
+    qr_code_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Enrollment
         fields = [
-            'id', 'student', 'course', 'is_active',
-            'progress_percentage', 'enrolled_at', 'completed_at',
-            'lesson_progress',
+            'id', 'student', 'course', 'is_active', 'attended',
+            'progress_percentage', 'completed_lessons', 'total_lessons',
+            'enrolled_at', 'completed_at', 'lesson_progress',
             # Payment fields
-            'paid', 'amount_paid', 'currency', 'payment_reference', 'qr_code',
+            'paid', 'amount_paid', 'currency', 'payment_reference', 'qr_code_url',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'enrolled_at', 'created_at', 'updated_at']
+    
+    def get_qr_code_url(self, obj):
+        """Ticket image URL for in-person courses (rendered on demand)"""
+        if obj.is_active and obj.course.is_in_person:
+            return ticket_qr_url(obj, self.context.get('request'))
+        return None
 
 
 class EnrollmentCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,158 @@
+"""
+Enrollment provisioning and progress tracking for courses app
+Shared by the enrollment views and the payment webhooks
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Least
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+from .models import Enrollment, Lesson, LessonProgress
+
+
+def progress_expression(completed, total):
+    """
+    Database expression for progress_percentage given completed/total lesson
+    expressions, using integer division like the stored value
+    """
+    return Case(
+        When(GreaterThan(total, 0), then=Least(completed * 100 / total, Value(100))),
+        default=Value(0)
+    )
+
+
+def create_lesson_progress(enrollment, lesson_ids):
+    """
+    Create the missing LessonProgress rows for the given lessons.
+
+    Uses one bulk INSERT, so the cost does not grow with the number of
+    lessons. Rows that already exist are skipped.
+    """
+    LessonProgress.objects.bulk_create(
+        [LessonProgress(enrollment=enrollment, lesson_id=lesson_id) for lesson_id in lesson_ids],
+        ignore_conflicts=True
+    )
+
+
+def provision_enrollment(student, course, enforce_capacity=False, **fields):
+    """
+    Create or reactivate a student's enrollment together with its lesson progress
+
+    Args:
+        student: User instance
+        course: Course instance
+        enforce_capacity: Claim a seat with a conditional UPDATE; raises
+            CourseFullError when the course is full
+        **fields: Extra Enrollment fields to set (payment details, etc.)
+
+    Returns:
+        Tuple of (enrollment, created)
+    """
+    lesson_ids = list(Lesson.objects.filter(course=course).values_list('id', flat=True))
+
+    with transaction.atomic():
+        enrollment = Enrollment.objects.select_for_update().filter(
+            student=student,
+            course=course
+        ).first()
+        created = enrollment is None
+        if created:
+            enrollment = Enrollment(student=student, course=course)
+        else:
+            enrollment.course = course
+
+        enrollment.is_active = True
+        enrollment.total_lessons = len(lesson_ids)
+        if enrollment.total_lessons:
+            enrollment.progress_percentage = min(
+                enrollment.completed_lessons * 100 // enrollment.total_lessons, 100
+            )
+        for name, value in fields.items():
+            setattr(enrollment, name, value)
+        enrollment.enforce_capacity = enforce_capacity
+        enrollment.save()
+
+        create_lesson_progress(enrollment, lesson_ids)
+
+    return enrollment, created
+
+
+def complete_lesson(enrollment, lesson_id, mark_course_completed=False):
+    """
+    Mark a lesson completed and advance the enrollment's progress counters
+
+    Only the call that moves the lesson from incomplete to completed writes:
+    the progress row is flipped with a conditional UPDATE and the enrollment
+    counters with one atomic UPDATE, so the cost does not depend on the
+    number of lessons. Completing an already completed lesson does no writes.
+
+    Args:
+        enrollment: Enrollment instance
+        lesson_id: ID of the lesson to complete
+        mark_course_completed: Set completed_at when the course reaches 100%
+
+    Returns:
+        Tuple of (lesson_progress, transitioned); lesson_progress is None
+        when the lesson does not belong to the enrollment's course
+    """
+    lesson_progress = LessonProgress.objects.select_related('lesson').filter(
+        enrollment=enrollment,
+        lesson_id=lesson_id
+    ).first()
+
+    # Idempotency guard: nothing to write for a completed lesson
+    if lesson_progress and lesson_progress.is_completed:
+        return lesson_progress, False
+
+    now = timezone.now()
+    with transaction.atomic():
+        transitioned = False
+        if lesson_progress is None:
+            lesson = Lesson.objects.filter(id=lesson_id, course_id=enrollment.course_id).first()
+            if lesson is None:
+                return None, False
+            lesson_progress, transitioned = LessonProgress.objects.get_or_create(
+                enrollment=enrollment,
+                lesson=lesson,
+                defaults={'is_completed': True, 'completed_at': now}
+            )
+        if not transitioned:
+            transitioned = LessonProgress.objects.filter(
+                pk=lesson_progress.pk,
+                is_completed=False
+            ).update(is_completed=True, completed_at=now, updated_at=now) == 1
+            if transitioned:
+                lesson_progress.is_completed = True
+                lesson_progress.completed_at = now
+                lesson_progress.updated_at = now
+
+        if transitioned:
+            _record_completion(enrollment, now, mark_course_completed)
+
+    return lesson_progress, transitioned
+
+
+def _record_completion(enrollment, now, mark_course_completed):
+    """Advance the enrollment counters by one completed lesson"""
+    completed = F('completed_lessons') + 1
+    updates = {
+        'completed_lessons': completed,
+        'progress_percentage': progress_expression(completed, F('total_lessons')),
+        'updated_at': now,
+    }
+    if mark_course_completed:
+        updates['completed_at'] = Case(
+            When(total_lessons__gt=0, total_lessons__lte=completed, then=Value(now)),
+            default=F('completed_at')
+        )
+    Enrollment.objects.filter(pk=enrollment.pk).update(**updates)
+
+    # Mirror the UPDATE on the loaded instance for the response
+    enrollment.completed_lessons += 1
+    enrollment.updated_at = now
+    if enrollment.total_lessons:
+        enrollment.progress_percentage = min(
+            enrollment.completed_lessons * 100 // enrollment.total_lessons, 100
+        )
+        if mark_course_completed and enrollment.completed_lessons >= enrollment.total_lessons:
+            enrollment.completed_at = now
@@ -0,0 +1,111 @@
+"""
+Signal handlers for courses app
+Keep Course.enrolled_count in sync with active enrollments and
+Enrollment.total_lessons in sync with the course's lessons
+"""
+from django.db.models import F, Q
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .models import Course, Enrollment, Lesson, CourseFullError
+from .services import progress_expression
+
+# Marker for instances loaded without is_active/course_id (e.g. .only())
+UNKNOWN = object()
+
+
+def _counted_course_id(enrollment):
+    """Return the course an enrollment counts towards, if any"""
+    values = enrollment.__dict__
+    if 'is_active' not in values or 'course_id' not in values:
+        return UNKNOWN
+    return values['course_id'] if values['is_active'] else None
+
+
+def _adjust_cached_course(enrollment, course_id, delta):
+    """Mirror the database change on an already loaded course instance"""
+    if Enrollment.course.is_cached(enrollment) and enrollment.course.pk == course_id:
+        enrollment.course.enrolled_count += delta
+
+
+def _increment(enrollment, course_id):
+    courses = Course.objects.filter(pk=course_id)
+    if enrollment.enforce_capacity:
+        # Conditional UPDATE: only claims a seat while one is free
+        courses = courses.filter(Q(max_students=0) | Q(enrolled_count__lt=F('max_students')))
+        if not courses.update(enrolled_count=F('enrolled_count') + 1):
+            raise CourseFullError(f'Course {course_id} is full.')
+    else:
+        courses.update(enrolled_count=F('enrolled_count') + 1)
+    _adjust_cached_course(enrollment, course_id, 1)
+
+
+def _decrement(enrollment, course_id):
+    Course.objects.filter(pk=course_id, enrolled_count__gt=0).update(
+        enrolled_count=F('enrolled_count') - 1
+    )
+    _adjust_cached_course(enrollment, course_id, -1)
+
+
+@receiver(post_init, sender=Enrollment)
+def remember_enrollment_state(sender, instance, **kwargs):
+    """Remember the loaded state so saves can tell what changed"""
+    instance._counted_course_id = _counted_course_id(instance)
+
+
+@receiver(post_save, sender=Enrollment)
+def update_enrolled_count_on_save(sender, instance, created, raw=False, **kwargs):
+    """Apply created, cancelled and reactivated enrollments to the counter"""
+    if raw:
+        return
+    before = None if created else instance._counted_course_id
+    after = _counted_course_id(instance)
+    instance._counted_course_id = after
+    if before == after or before is UNKNOWN or after is UNKNOWN:
+        return
+    if before:
+        _decrement(instance, before)
+    if after:
+        _increment(instance, after)
+
+
+@receiver(post_delete, sender=Enrollment)
+def update_enrolled_count_on_delete(sender, instance, origin=None, **kwargs):
+    """Release the seat held by a deleted enrollment, unless its course is being deleted"""
+    if isinstance(origin, Course) or getattr(origin, 'model', None) is Course:
+        return
+    before = instance._counted_course_id
+    if before and before is not UNKNOWN:
+        _decrement(instance, before)
+
+
+@receiver(post_save, sender=Lesson)
+def add_lesson_to_enrollments(sender, instance, created, raw=False, **kwargs):
+    """Grow total_lessons of every enrollment in the course with one UPDATE"""
+    if raw or not created:
+        return
+    total = F('total_lessons') + 1
+    Enrollment.objects.filter(course_id=instance.course_id).update(
+        total_lessons=total,
+        progress_percentage=progress_expression(F('completed_lessons'), total)
+    )
+
+
+@receiver(pre_delete, sender=Lesson)
+def remove_lesson_from_enrollments(sender, instance, origin=None, **kwargs):
+    """
+    Shrink the enrollment counters before the lesson's progress rows
+    cascade, unless the course (and so its enrollments) is being deleted
+    """
+    if isinstance(origin, Course) or getattr(origin, 'model', None) is Course:
+        return
+    Enrollment.objects.filter(
+        lesson_progress__lesson=instance,
+        lesson_progress__is_completed=True,
+        completed_lessons__gt=0
+    ).update(completed_lessons=F('completed_lessons') - 1)
+
+    total = F('total_lessons') - 1
+    Enrollment.objects.filter(course_id=instance.course_id, total_lessons__gt=0).update(
+        total_lessons=total,
+        progress_percentage=progress_expression(F('completed_lessons'), total)
+    )
@@ -6,7 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .models import Course, Lesson, Enrollment, LessonProgress
+from .models import Course, Lesson, Enrollment, LessonProgress, CourseFullError
 from .serializers import (
     CourseListSerializer,
     CourseDetailSerializer,
@@ -15,9 +15,8 @@ from .serializers import (
     EnrollmentCreateSerializer,
     LessonProgressSerializer
 )
-import qrcode
-import io
-import base64
+from .services import provision_enrollment, complete_lesson
+from core.tickets import check_in_ticket, read_ticket_token
 import uuid
 import stripe
 from django.conf import settings
@@ -65,7 +64,11 @@ class CourseViewSet(viewsets.ModelViewSet):
         search = self.request.query_params.get('search', None)
         if search:
             queryset = queryset.filter(title__icontains=search)
-        
+
+        # Join the teacher for read-only catalog views
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.for_catalog()
+
         return queryset
     
     def retrieve(self, request, *args, **kwargs):
@@ -141,30 +144,21 @@ class CourseViewSet(viewsets.ModelViewSet):
         # Check if already enrolled (active)
         if Enrollment.objects.filter(student=user, course=course, is_active=True).exists():
             existing = Enrollment.objects.get(student=user, course=course, is_active=True)
-            serializer = EnrollmentSerializer(existing)
+            serializer = EnrollmentSerializer(existing, context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         # Handle free courses/events
         if payment_intent_id == 'free':
-            # Check if there's an inactive enrollment and reactivate it
-            try:
-                enrollment = Enrollment.objects.get(student=user, course=course, is_active=False)
-                enrollment.is_active = True
-            except Enrollment.DoesNotExist:
-                # Create new enrollment if none exists
-                enrollment = Enrollment.objects.create(student=user, course=course)
-            
-            enrollment.paid = True
-            enrollment.amount_paid = 0
-            enrollment.currency = 'EUR'
-            enrollment.payment_reference = 'free'
-            
-            # Create lesson progress entries for all lessons
-            for lesson in course.lessons.all():
-                LessonProgress.objects.get_or_create(enrollment=enrollment, lesson=lesson)
-            
-            enrollment.save()
-            serializer = EnrollmentSerializer(enrollment)
+            # Reactivate an inactive enrollment or create a new one
+            enrollment, _ = provision_enrollment(
+                user,
+                course,
+                paid=True,
+                amount_paid=0,
+                currency='EUR',
+                payment_reference='free'
+            )
+            serializer = EnrollmentSerializer(enrollment, context={'request': request})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         # Determine payment type: IAP (iOS) vs Stripe (Android)
@@ -193,48 +187,16 @@ class CourseViewSet(viewsets.ModelViewSet):
             except Exception as e:
                 return Response({'error': f'Payment verification failed: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if there's an inactive enrollment and reactivate it
-        is_reactivation = False
-        try:
-            enrollment = Enrollment.objects.get(student=user, course=course, is_active=False)
-            enrollment.is_active = True
-            is_reactivation = True
-        except Enrollment.DoesNotExist:
-            # Create new enrollment if none exists
-            enrollment = Enrollment.objects.create(student=user, course=course)
-        
-        enrollment.paid = True
-        enrollment.amount_paid = amount_paid
-        enrollment.currency = currency
-        enrollment.payment_reference = payment_intent_id
-
-        # Generate QR code only for in-person courses
-        if course.is_in_person:
-            qr_payload = {
-                'enrollment_id': str(enrollment.id),
-                'course_id': str(course.id),
-                'student_id': str(user.id),
-                'name': f"{user.get_full_name()}",
-                'course_title': course.title,
-            }
-            qr_text = str(qr_payload)
-            qr = qrcode.QRCode(box_size=10, border=4)
-            qr.add_data(qr_text)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
-            qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-            enrollment.qr_code = qr_b64
-
-        # Create lesson progress entries only for new enrollments
-        if not is_reactivation:
-            for lesson in course.lessons.all():
-                LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        # Reactivate an inactive enrollment or create a new one
+        enrollment, _ = provision_enrollment(
+            user,
+            course,
+            paid=True,
+            amount_paid=amount_paid,
+            currency=currency,
+            payment_reference=payment_intent_id
+        )
 
-        enrollment.save()
-        
         # Send purchase confirmation email
         from core.email_utils import send_email
         from datetime import datetime
@@ -259,7 +221,7 @@ class CourseViewSet(viewsets.ModelViewSet):
             }
         )
         
-        serializer = EnrollmentSerializer(enrollment)
+        serializer = EnrollmentSerializer(enrollment, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -291,41 +253,31 @@ class CourseViewSet(viewsets.ModelViewSet):
                 'error': 'Payment required for this course. Include simulate_payment=true in request for testing.'
             }, status=status.HTTP_402_PAYMENT_REQUIRED)
 
-        # Create enrollment
-        enrollment = Enrollment.objects.create(student=user, course=course)
-
         # If paid, mark payment fields
+        payment_fields = {}
         if course.price and float(course.price) > 0:
-            enrollment.paid = True
-            enrollment.amount_paid = course.price
-            enrollment.currency = 'EUR'
-            enrollment.payment_reference = str(uuid.uuid4())
-            # Generate QR only for in-person courses
-            if course.is_in_person:
-                qr_payload = {
-                    'enrollment_id': str(enrollment.id),
-                    'course_id': str(course.id),
-                    'student_id': str(user.id),
-                    'name': f"{user.get_full_name()}",
-                    'course_title': course.title,
-                }
-                qr_text = str(qr_payload)
-                qr = qrcode.QRCode(box_size=10, border=4)
-                qr.add_data(qr_text)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                buffer.seek(0)
-                qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                enrollment.qr_code = qr_b64
+            payment_fields = {
+                'paid': True,
+                'amount_paid': course.price,
+                'currency': 'EUR',
+                'payment_reference': str(uuid.uuid4()),
+            }
 
-        # Create lesson progress entries for all lessons
-        for lesson in course.lessons.all():
-            LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
-        
-        enrollment.save()
-        serializer = EnrollmentSerializer(enrollment)
+        # Create the enrollment and its lesson progress; the seat is claimed
+        # with a conditional UPDATE so concurrent signups cannot oversubscribe
+        try:
+            enrollment, _ = provision_enrollment(
+                user,
+                course,
+                enforce_capacity=True,
+                **payment_fields
+            )
+        except CourseFullError:
+            return Response({
+                'error': 'This course is full.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = EnrollmentSerializer(enrollment, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -381,7 +333,7 @@ class LessonViewSet(viewsets.ModelViewSet):
         try:
             enrollment = Enrollment.objects.get(
                 student=user,
-                course=lesson.course,
+                course_id=lesson.course_id,
                 is_active=True
             )
         except Enrollment.DoesNotExist:
@@ -389,31 +341,8 @@ class LessonViewSet(viewsets.ModelViewSet):
                 'error': 'You are not enrolled in this course.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update lesson progress
-        lesson_progress, created = LessonProgress.objects.get_or_create(
-            enrollment=enrollment,
-            lesson=lesson
-        )
-        
-        if not lesson_progress.is_completed:
-            lesson_progress.is_completed = True
-            lesson_progress.completed_at = timezone.now()
-            lesson_progress.save()
-            
-            # Update enrollment progress
-            total_lessons = enrollment.course.lessons.count()
-            completed_lessons = LessonProgress.objects.filter(
-                enrollment=enrollment,
-                is_completed=True
-            ).count()
-            
-            enrollment.progress_percentage = int((completed_lessons / total_lessons) * 100)
-            
-            # Check if course is completed
-            if enrollment.progress_percentage == 100:
-                enrollment.completed_at = timezone.now()
-            
-            enrollment.save()
+        # Update lesson progress and the enrollment counters (no-op if already completed)
+        lesson_progress, _ = complete_lesson(enrollment, lesson.id, mark_course_completed=True)
         
         serializer = LessonProgressSerializer(lesson_progress)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -453,36 +382,13 @@ class EnrollmentViewSet(viewsets.ReadOnlyModelViewSet):
         """
         enrollment = self.get_object()
         
-        # Verify the lesson belongs to the course
-        try:
-            lesson = Lesson.objects.get(id=lesson_id, course=enrollment.course)
-        except Lesson.DoesNotExist:
+        # Complete the lesson if it belongs to the course (no-op if already completed)
+        lesson_progress, _ = complete_lesson(enrollment, lesson_id)
+        if lesson_progress is None:
             return Response({
                 'error': 'Lesson not found in this course.'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Create or update lesson progress
-        lesson_progress, created = LessonProgress.objects.get_or_create(
-            enrollment=enrollment,
-            lesson=lesson,
-            defaults={'is_completed': True}
-        )
-        
-        if not created and not lesson_progress.is_completed:
-            lesson_progress.is_completed = True
-            lesson_progress.save()
-        
-        # Update overall course progress
-        total_lessons = enrollment.course.lessons.count()
-        completed_lessons = LessonProgress.objects.filter(
-            enrollment=enrollment,
-            is_completed=True
-        ).count()
-        
-        if total_lessons > 0:
-            enrollment.progress_percentage = int((completed_lessons / total_lessons) * 100)
-            enrollment.save()
-        
         return Response({
             'message': 'Lesson marked as complete',
             'progress_percentage': enrollment.progress_percentage
@@ -553,3 +459,40 @@ class EnrollmentViewSet(viewsets.ReadOnlyModelViewSet):
         
         serializer = self.get_serializer(orders, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'], url_path='check-in')
+    def check_in(self, request):
+        """
+        Check in a student from a scanned ticket code (admin/staff only)
+        POST /api/v1/enrollments/check-in/
+        Body: {code}
+        """
+        if not (request.user.is_admin or request.user.is_staff_member):
+            return Response({
+                'error': 'Only staff can check in tickets.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        # Forged codes are rejected before any query
+        ticket = read_ticket_token(request.data.get('code'))
+        if ticket is None or ticket[0] != 'enrollment':
+            return Response({
+                'error': 'Invalid ticket.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        row, checked_in = check_in_ticket(
+            Enrollment.objects.filter(is_active=True),
+            ticket[1],
+            ['id', 'student__first_name', 'student__last_name', 'course__title']
+        )
+        if row is None:
+            return Response({
+                'error': 'Enrollment not found or inactive.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'id': row['id'],
+            'type': 'enrollment',
+            'name': f"{row['student__first_name']} {row['student__last_name']}".strip(),
+            'title': row['course__title'],
+            'already_checked_in': not checked_in,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_registered_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+    active = EventRegistration.objects.filter(
+        event=OuterRef('pk'), is_cancelled=False
+    ).order_by().values('event').annotate(total=Count('pk')).values('total')
+    Event.objects.update(registered_count=Coalesce(Subquery(active), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_alter_event_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='registered_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Active registrations, maintained by events.signals'),
+        ),
+        migrations.RunPython(backfill_registered_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_registered_count'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='eventregistration',
+            name='qr_code',
+        ),
+    ]
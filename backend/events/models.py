@@ -6,6 +6,12 @@ from django.db import models
 from django.conf import settings
 
 
+class EventFullError(Exception):
+    """
+    Raised when a capacity-enforced registration cannot claim a seat
+    """
+
+
 class Event(models.Model):
     """
     Event model for seminars, congresses, and workshops
@@ -50,6 +56,11 @@ class Event(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     max_attendees = models.IntegerField(default=0, help_text='0 means unlimited')
     registration_deadline = models.DateTimeField(blank=True, null=True)
+    registered_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Active registrations, maintained by events.signals'
+    )
     
     # Status
     is_published = models.BooleanField(default=False)
@@ -67,10 +78,6 @@ class Event(models.Model):
     def __str__(self):
         return self.title
     
-    @property
-    def registered_count(self):
-        return self.registrations.filter(is_cancelled=False).count()
-    
     @property
     def is_full(self):
         if self.max_attendees == 0:
@@ -104,10 +111,14 @@ class EventRegistration(models.Model):
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     currency = models.CharField(max_length=10, default='EUR')
     payment_reference = models.CharField(max_length=255, blank=True, null=True)
-    qr_code = models.TextField(blank=True, null=True, help_text='Base64 PNG for in-person registrations')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Set to True before saving to claim a seat with a conditional UPDATE;
+    # the save must run inside transaction.atomic() so a full event
+    # (EventFullError) rolls the registration back.
+    enforce_capacity = False
+    
     class Meta:
         db_table = 'event_registrations'
         ordering = ['-registered_at']
@@ -4,6 +4,7 @@ Serializers for events app
 from rest_framework import serializers
 from .models import Event, EventRegistration, EventSpeaker
 from accounts.serializers import UserSerializer
+from core.tickets import ticket_qr_url
 
 
 class EventSpeakerSerializer(serializers.ModelSerializer):
@@ -69,6 +70,7 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
     """
     attendee = UserSerializer(read_only=True)
     event = EventListSerializer(read_only=True)
+    qr_code_url = serializers.SerializerMethodField()
     
     class Meta:
         model = EventRegistration
@@ -76,10 +78,16 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
             'id', 'event', 'attendee', 'is_cancelled', 'attended',
             'notes', 'registered_at',
             # Payment fields
-            'paid', 'amount_paid', 'currency', 'payment_reference', 'qr_code',
+            'paid', 'amount_paid', 'currency', 'payment_reference', 'qr_code_url',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'registered_at', 'created_at', 'updated_at']
+    
+    def get_qr_code_url(self, obj):
+        """Ticket image URL for in-person events (rendered on demand)"""
+        if not obj.is_cancelled and obj.event.is_in_person:
+            return ticket_qr_url(obj, self.context.get('request'))
+        return None
 
 
 class EventRegistrationCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,76 @@
+"""
+Signal handlers for events app
+Keep Event.registered_count in sync with active registrations
+"""
+from django.db.models import F, Q
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .models import Event, EventRegistration, EventFullError
+
+# Marker for instances loaded without is_cancelled/event_id (e.g. .only())
+UNKNOWN = object()
+
+
+def _counted_event_id(registration):
+    """Return the event a registration counts towards, if any"""
+    values = registration.__dict__
+    if 'is_cancelled' not in values or 'event_id' not in values:
+        return UNKNOWN
+    return None if values['is_cancelled'] else values['event_id']
+
+
+def _adjust_cached_event(registration, event_id, delta):
+    """Mirror the database change on an already loaded event instance"""
+    if EventRegistration.event.is_cached(registration) and registration.event.pk == event_id:
+        registration.event.registered_count += delta
+
+
+def _increment(registration, event_id):
+    events = Event.objects.filter(pk=event_id)
+    if registration.enforce_capacity:
+        # Conditional UPDATE: only claims a seat while one is free
+        events = events.filter(Q(max_attendees=0) | Q(registered_count__lt=F('max_attendees')))
+        if not events.update(registered_count=F('registered_count') + 1):
+            raise EventFullError(f'Event {event_id} is full.')
+    else:
+        events.update(registered_count=F('registered_count') + 1)
+    _adjust_cached_event(registration, event_id, 1)
+
+
+def _decrement(registration, event_id):
+    Event.objects.filter(pk=event_id, registered_count__gt=0).update(
+        registered_count=F('registered_count') - 1
+    )
+    _adjust_cached_event(registration, event_id, -1)
+
+
+@receiver(post_init, sender=EventRegistration)
+def remember_registration_state(sender, instance, **kwargs):
+    """Remember the loaded state so saves can tell what changed"""
+    instance._counted_event_id = _counted_event_id(instance)
+
+
+@receiver(post_save, sender=EventRegistration)
+def update_registered_count_on_save(sender, instance, created, raw=False, **kwargs):
+    """Apply created, cancelled and reactivated registrations to the counter"""
+    if raw:
+        return
+    before = None if created else instance._counted_event_id
+    after = _counted_event_id(instance)
+    instance._counted_event_id = after
+    if before == after or before is UNKNOWN or after is UNKNOWN:
+        return
+    if before:
+        _decrement(instance, before)
+    if after:
+        _increment(instance, after)
+
+
+@receiver(post_delete, sender=EventRegistration)
+def update_registered_count_on_delete(sender, instance, origin=None, **kwargs):
+    """Release the seat held by a deleted registration, unless its event is being deleted"""
+    if isinstance(origin, Event) or getattr(origin, 'model', None) is Event:
+        return
+    before = instance._counted_event_id
+    if before and before is not UNKNOWN:
+        _decrement(instance, before)
@@ -4,13 +4,15 @@ Views for events app
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from django.conf import settings
+from django.db import transaction
 import stripe
-import qrcode
-import io
-import base64
-from .models import Event, EventRegistration, EventSpeaker
+from .models import Event, EventRegistration, EventSpeaker, EventFullError
+from .services import MAX_CHECK_IN_BATCH, apply_check_ins, iter_check_in_manifest, manifest_revision
 from .serializers import (
     EventListSerializer,
     EventDetailSerializer,
@@ -18,10 +20,8 @@ from .serializers import (
     EventRegistrationCreateSerializer,
     EventSpeakerSerializer
 )
-import qrcode
-import io
-import base64
 import uuid
+from core.tickets import check_in_ticket, read_ticket_token
 
 
 class EventViewSet(viewsets.ModelViewSet):
@@ -45,6 +45,10 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer.save(organizer=self.request.user)
     
     def get_queryset(self):
+        # Door staff check in at unpublished and finished events too
+        if self.action in ('check_in_manifest', 'check_in_batch'):
+            return Event.objects.all()
+        
         queryset = super().get_queryset()
         
         # Filter by event type
@@ -134,51 +138,38 @@ class EventViewSet(viewsets.ModelViewSet):
         notes = request.data.get('notes', '')
         simulate_payment = request.data.get('simulate_payment', False)
 
-        registration = EventRegistration.objects.create(
+        if event.price and float(event.price) > 0 and not simulate_payment:
+            # Payment required
+            # Frontend should call with simulate_payment=true or integrate real gateway
+            return Response({
+                'error': 'Payment required for this event. Include simulate_payment=true in request for testing.'
+            }, status=status.HTTP_402_PAYMENT_REQUIRED)
+
+        # The seat is claimed with a conditional UPDATE so concurrent
+        # registrations cannot oversubscribe the event
+        registration = EventRegistration(
             attendee=user,
             event=event,
             notes=notes
         )
+        registration.enforce_capacity = True
 
         if event.price and float(event.price) > 0:
-            if not simulate_payment:
-                # Payment required
-                # Frontend should call with simulate_payment=true or integrate real gateway
-                registration.delete()
-                return Response({
-                    'error': 'Payment required for this event. Include simulate_payment=true in request for testing.'
-                }, status=status.HTTP_402_PAYMENT_REQUIRED)
-
             # Simulate payment success
             registration.paid = True
             registration.amount_paid = event.price
             registration.currency = 'EUR'
             registration.payment_reference = str(uuid.uuid4())
 
-            # If in-person generate QR code (base64 PNG)
-            if event.is_in_person:
-                qr_payload = {
-                    'registration_id': str(registration.id),
-                    'event_id': str(event.id),
-                    'attendee_id': str(user.id),
-                    'name': f"{user.get_full_name()}",
-                    'event_title': event.title,
-                    'start_date': event.start_date.isoformat(),
-                }
-                qr_text = str(qr_payload)
-                qr = qrcode.QRCode(box_size=10, border=4)
-                qr.add_data(qr_text)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                buffer.seek(0)
-                qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                registration.qr_code = qr_b64
-
-            registration.save()
+        try:
+            with transaction.atomic():
+                registration.save()
+        except EventFullError:
+            return Response({
+                'error': 'This event is full.'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = EventRegistrationSerializer(registration)
+        serializer = EventRegistrationSerializer(registration, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -231,7 +222,7 @@ class EventViewSet(viewsets.ModelViewSet):
         # Check if already registered (active)
         if EventRegistration.objects.filter(attendee=user, event=event, is_cancelled=False).exists():
             existing = EventRegistration.objects.get(attendee=user, event=event, is_cancelled=False)
-            serializer = EventRegistrationSerializer(existing)
+            serializer = EventRegistrationSerializer(existing, context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         # Handle free events
@@ -248,31 +239,8 @@ class EventViewSet(viewsets.ModelViewSet):
             registration.currency = 'EUR'
             registration.payment_reference = 'free'
             
-            # Generate QR code for in-person events
-            if event.is_in_person:
-                import qrcode
-                import io
-                import base64
-                qr_payload = {
-                    'registration_id': str(registration.id),
-                    'event_id': str(event.id),
-                    'attendee_id': str(user.id),
-                    'name': f"{user.get_full_name()}",
-                    'event_title': event.title,
-                }
-                qr_text = str(qr_payload)
-                qr = qrcode.QRCode(box_size=10, border=4)
-                qr.add_data(qr_text)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                buffer.seek(0)
-                qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                registration.qr_code = qr_b64
-            
             registration.save()
-            serializer = EventRegistrationSerializer(registration)
+            serializer = EventRegistrationSerializer(registration, context={'request': request})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         # Determine payment type: IAP (iOS) vs Stripe (Android)
@@ -313,29 +281,8 @@ class EventViewSet(viewsets.ModelViewSet):
         registration.currency = currency
         registration.payment_reference = payment_intent_id
 
-        # Generate QR code only for in-person events
-        if event.is_in_person:
-            qr_payload = {
-                'registration_id': str(registration.id),
-                'event_id': str(event.id),
-                'attendee_id': str(user.id),
-                'name': f"{user.get_full_name()}",
-                'event_title': event.title,
-                'start_date': event.start_date.isoformat() if event.start_date else ''
-            }
-            qr_text = str(qr_payload)
-            qr = qrcode.QRCode(box_size=10, border=4)
-            qr.add_data(qr_text)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
-            qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-            registration.qr_code = qr_b64
-
         registration.save()
-        serializer = EventRegistrationSerializer(registration)
+        serializer = EventRegistrationSerializer(registration, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -365,6 +312,65 @@ class EventViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
+    @action(detail=True, methods=['get'], url_path='check-in-manifest', permission_classes=[permissions.IsAuthenticated])
+    def check_in_manifest(self, request, pk=None):
+        """
+        Stream the offline check-in manifest of an event (admin/staff only)
+        GET /api/v1/events/{id}/check-in-manifest/
+        Newline-delimited JSON: a header line, then one line per valid ticket
+        """
+        if not (request.user.is_admin or request.user.is_staff_member):
+            return Response({
+                'error': 'Only staff can download check-in manifests.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        event = self.get_object()
+        revision = manifest_revision(event)
+        
+        # Scanners re-sync cheaply when nothing has changed
+        etag = quote_etag(revision)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        response = StreamingHttpResponse(
+            iter_check_in_manifest(event, revision),
+            content_type='application/x-ndjson'
+        )
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    @action(detail=True, methods=['post'], url_path='check-in-batch', permission_classes=[permissions.IsAuthenticated])
+    def check_in_batch(self, request, pk=None):
+        """
+        Apply check-ins queued by an offline scanner (admin/staff only)
+        POST /api/v1/events/{id}/check-in-batch/
+        Body: {codes: [...]}
+        """
+        if not (request.user.is_admin or request.user.is_staff_member):
+            return Response({
+                'error': 'Only staff can check in tickets.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        codes = request.data.get('codes')
+        if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+            return Response({
+                'error': 'codes must be a list of ticket codes.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(codes) > MAX_CHECK_IN_BATCH:
+            return Response({
+                'error': f'At most {MAX_CHECK_IN_BATCH} codes per batch.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        event = self.get_object()
+        checked_in, conflicts = apply_check_ins(event, codes)
+        
+        return Response({
+            'checked_in': checked_in,
+            'conflicts': conflicts,
+        }, status=status.HTTP_200_OK)
+
+
 class EventRegistrationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for EventRegistration model (read-only)
@@ -380,6 +386,43 @@ class EventRegistrationViewSet(viewsets.ReadOnlyModelViewSet):
         if user.is_admin:
             return EventRegistration.objects.filter(is_cancelled=False).select_related('attendee', 'event')
         return EventRegistration.objects.filter(attendee=user, is_cancelled=False)
+    
+    @action(detail=False, methods=['post'], url_path='check-in')
+    def check_in(self, request):
+        """
+        Check in an attendee from a scanned ticket code (admin/staff only)
+        POST /api/v1/event-registrations/check-in/
+        Body: {code}
+        """
+        if not (request.user.is_admin or request.user.is_staff_member):
+            return Response({
+                'error': 'Only staff can check in tickets.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        # Forged codes are rejected before any query
+        ticket = read_ticket_token(request.data.get('code'))
+        if ticket is None or ticket[0] != 'eventregistration':
+            return Response({
+                'error': 'Invalid ticket.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        row, checked_in = check_in_ticket(
+            EventRegistration.objects.filter(is_cancelled=False),
+            ticket[1],
+            ['id', 'attendee__first_name', 'attendee__last_name', 'event__title']
+        )
+        if row is None:
+            return Response({
+                'error': 'Registration not found or cancelled.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'id': row['id'],
+            'type': 'registration',
+            'name': f"{row['attendee__first_name']} {row['attendee__last_name']}".strip(),
+            'title': row['event__title'],
+            'already_checked_in': not checked_in,
+        }, status=status.HTTP_200_OK)
 
 
 class EventSpeakerViewSet(viewsets.ModelViewSet):
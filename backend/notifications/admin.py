@@ -3,7 +3,7 @@ Notifications app admin configuration
 """
 
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, OutboxEmail
 
 
 @admin.register(Notification)
@@ -16,6 +16,7 @@ class NotificationAdmin(admin.ModelAdmin):
         'user',
         'notification_type',
         'title',
+        'actor_count',
         'is_read',
         'created_at',
     ]
@@ -31,7 +32,7 @@ class NotificationAdmin(admin.ModelAdmin):
         'title',
         'message',
     ]
-    readonly_fields = ['created_at', 'read_at']
+    readonly_fields = ['actor_count', 'window_start', 'created_at', 'read_at']
     date_hierarchy = 'created_at'
     
     fieldsets = (
@@ -46,10 +47,36 @@ class NotificationAdmin(admin.ModelAdmin):
             )
         }),
         ('Link', {
-            'fields': ('link_type', 'link_id'),
+            'fields': ('link_type', 'link_id', 'actor_count', 'window_start'),
             'classes': ('collapse',)
         }),
         ('Status', {
             'fields': ('is_read', 'read_at', 'created_at')
         }),
     )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """
+    Admin interface for OutboxEmail model
+    """
+    list_display = [
+        'id',
+        'subject',
+        'to',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'created_at',
+    ]
+    list_filter = [
+        'status',
+        'created_at',
+    ]
+    search_fields = [
+        'subject',
+        'to',
+    ]
+    readonly_fields = ['attempts', 'last_error', 'sent_at', 'created_at']
+    date_hierarchy = 'created_at'
@@ -9,3 +9,10 @@ class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifications'
     verbose_name = 'Notifications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Compile the email templates once at startup
+        from core.email_utils import warm_email_templates
+        warm_email_templates()
@@ -0,0 +1,91 @@
+"""
+WebSocket consumers for notifications app
+"""
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from courses.models import Enrollment
+from events.models import EventRegistration
+from .counters import get_unread_count
+from .realtime import audience_group_name, user_group_name
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live notifications of the connected user
+    ws/notifications/?token=<access token>
+
+    Server -> client:
+        {"type": "unread_count", "unread_count": 3}  (on connect and after reads)
+        {"type": "notification", "notification": {...}, "unread_count": 4}
+        {"type": "announcement", "title": "...", "message": "...",
+         "link_type": null, "link_id": null}  (fetch unread_count/ to update the badge)
+    """
+    groups_joined = frozenset()
+
+    async def connect(self):
+        self.user = self.scope['user']
+
+        # Rejecting before accept() fails the handshake (HTTP 403)
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+
+        self.groups_joined = {user_group_name(self.user.pk), *await self.audience_groups()}
+        for group in self.groups_joined:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+        await self.send_json({
+            'type': 'unread_count',
+            'unread_count': await database_sync_to_async(get_unread_count)(self.user.pk),
+        })
+
+    async def disconnect(self, code):
+        for group in self.groups_joined:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    @database_sync_to_async
+    def audience_groups(self):
+        """Announcement groups of everyone, and of the user's courses and events"""
+        course_ids = Enrollment.objects.filter(
+            student=self.user, is_active=True
+        ).values_list('course_id', flat=True)
+        event_ids = EventRegistration.objects.filter(
+            attendee=self.user, is_cancelled=False
+        ).values_list('event_id', flat=True)
+        return [
+            audience_group_name('all'),
+            *[audience_group_name('course', course_id) for course_id in course_ids],
+            *[audience_group_name('event', event_id) for event_id in event_ids],
+        ]
+
+    async def receive_json(self, content, **kwargs):
+        # Reads go through the REST endpoints
+        await self.send_json({'type': 'error', 'error': 'Unknown event type.'})
+
+    async def notification_created(self, event):
+        await self.send_json({
+            'type': 'notification',
+            'notification': event['notification'],
+            'unread_count': event['unread_count'],
+        })
+
+    async def notification_unread_count(self, event):
+        await self.send_json({'type': 'unread_count', 'unread_count': event['unread_count']})
+
+    async def notification_audience(self, event):
+        # Enrolled, registered, cancelled... while connected
+        if event['joined']:
+            self.groups_joined.add(event['group'])
+            await self.channel_layer.group_add(event['group'], self.channel_name)
+        else:
+            self.groups_joined.discard(event['group'])
+            await self.channel_layer.group_discard(event['group'], self.channel_name)
+
+    async def notification_announcement(self, event):
+        await self.send_json({
+            'type': 'announcement',
+            'title': event['title'],
+            'message': event['message'],
+            'link_type': event['link_type'],
+            'link_id': event['link_id'],
+        })
@@ -0,0 +1,145 @@
+"""
+Cached unread notification counts
+The count of each user lives in the cache (Redis, or each process's memory
+without CACHE_REDIS_URL) and is adjusted when notifications are created or
+read, so the badge endpoint does not count rows. A missing count is
+recounted and stored with cache.add(). A write that finds no count stores
+a short-lived tombstone under the key instead, which makes a recount that
+started before the write fail to store its now stale result; reads
+recount until the tombstone expires. Announcements only increment the
+counts that are cached, so their recipients keep being served from the
+cache. reconcile_unread_counts() corrects whatever drift is left.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from .models import Notification
+
+# Tombstone value: far enough below zero that increments keep it negative,
+# and incr() keeps the key's expiry
+STALE = -1_000_000_000
+STALE_TIMEOUT = 60
+
+# Redis: increment a key only if it exists, so a count is never created
+INCR_IF_CACHED = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('incrby', KEYS[1], ARGV[1])
+end
+"""
+
+
+def unread_count_key(user_id):
+    """Cache key of a user's unread notification count"""
+    return f'notifications:unread:{user_id}'
+
+
+def count_unread(user_id):
+    """Unread notifications of a user, counted in the database"""
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def get_unread_count(user_id):
+    """Unread notification count of a user, from the cache when present"""
+    key = unread_count_key(user_id)
+    count = cache.get(key)
+    if count is None or count < 0:
+        count = count_unread(user_id)
+        # Fails while a tombstone or a fresher count is stored
+        cache.add(key, count, settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def _mark_stale(keys):
+    cache.set_many({key: STALE for key in keys}, STALE_TIMEOUT)
+
+
+def _adjust(user_id, delta):
+    key = unread_count_key(user_id)
+    try:
+        count = cache.incr(key, delta)
+    except ValueError:
+        # Not cached: a recount may be in flight that missed this change
+        _mark_stale([key])
+        return
+    if count < 0 and count - delta >= 0:
+        # Drifted below zero
+        _mark_stale([key])
+
+
+def adjust_unread_count(user_id, delta):
+    """Add delta to a user's cached count once the current transaction commits"""
+    transaction.on_commit(lambda: _adjust(user_id, delta))
+
+
+def reset_unread_count(user_id):
+    """Set a user's cached count to zero once the current transaction commits"""
+    transaction.on_commit(
+        lambda: cache.set(unread_count_key(user_id), 0, settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+    )
+
+
+def _increment_cached(keys):
+    redis = getattr(cache, '_cache', None)
+    if hasattr(redis, 'get_client'):
+        # One round trip for the whole batch
+        client = redis.get_client(write=True)
+        script = client.register_script(INCR_IF_CACHED)
+        pipeline = client.pipeline(transaction=False)
+        for key in keys:
+            script(keys=[cache.make_and_validate_key(key)], args=[1], client=pipeline)
+        pipeline.execute()
+        return
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def increment_unread_counts(user_ids):
+    """
+    Add one to the cached counts of many users (e.g. an announcement) once
+    the current transaction commits; users without a cached count are
+    skipped, as their next read counts them
+    """
+    keys = [unread_count_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: _increment_cached(keys))
+
+
+def invalidate_unread_counts(user_ids):
+    """Make users' counts be recounted once the current transaction commits"""
+    keys = [unread_count_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: _mark_stale(keys))
+
+
+def reconcile_unread_counts(user_ids, fix=True):
+    """
+    Compare the cached counts of users with the database and overwrite the
+    ones that drifted (users without a cached count, or with a tombstone,
+    are skipped)
+
+    Returns:
+        Number of drifted counts
+    """
+    keys = {unread_count_key(user_id): user_id for user_id in user_ids}
+    cached = {key: count for key, count in cache.get_many(keys).items() if count >= 0}
+    if not cached:
+        return 0
+
+    cached_ids = [keys[key] for key in cached]
+    actual = dict(
+        Notification.objects.filter(user_id__in=cached_ids, is_read=False)
+        .order_by()
+        .values('user_id')
+        .annotate(count=Count('id'))
+        .values_list('user_id', 'count')
+    )
+    drifted = {
+        key: actual.get(keys[key], 0)
+        for key, count in cached.items()
+        if count != actual.get(keys[key], 0)
+    }
+    if drifted and fix:
+        cache.set_many(drifted, settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+    return len(drifted)
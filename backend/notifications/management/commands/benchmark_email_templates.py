@@ -0,0 +1,70 @@
+"""
+Management command to benchmark email template rendering
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from core.email_utils import branding_context, email_template_names, render_emails
+
+# Values for every variable used by the templates in templates/emails/
+SAMPLE_CONTEXT = {
+    'user_name': 'Jane Doe',
+    'email': 'jane@example.com',
+    'role': 'student',
+    'registration_date': 'January 01, 2026',
+    'deletion_date': 'January 01, 2026 at 10:00 AM',
+    'request_time': 'January 01, 2026 at 10:00 AM',
+    'reset_code': '123456',
+    'course_id': '00000000-0000-0000-0000-000000000000',
+    'course_title': 'Benchmark Course',
+    'course_description': 'A course used to benchmark email rendering.',
+    'amount': '49.00',
+    'currency': 'USD',
+    'order_id': 'BENCH-0001',
+    'payment_reference': 'pi_benchmark',
+    'purchase_date': 'January 01, 2026',
+    'instructor_name': 'Dr. Smith',
+    'lesson_count': 12,
+    'duration': '6 weeks',
+    'completion_date': 'January 01, 2026',
+    'certificate_id': 'CERT-BENCH',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Report renders per second of each email template, rendered one by one '
+        'with render_to_string and in bulk with render_emails'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--renders',
+            type=int,
+            default=2000,
+            help='Recipients to render per template and strategy',
+        )
+
+    def handle(self, *args, **options):
+        count = options['renders']
+        contexts = [
+            {**SAMPLE_CONTEXT, 'user_name': f'Recipient {n}', 'email': f'recipient{n}@example.com'}
+            for n in range(count)
+        ]
+        self.stdout.write(f'{"template":<24} {"single/s":>10} {"bulk/s":>10} {"speedup":>8}')
+
+        for name in email_template_names():
+            if name == 'base':
+                continue
+
+            start = time.perf_counter()
+            for context in contexts:
+                render_to_string(f'emails/{name}.html', {**context, **branding_context()})
+            single = count / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in render_emails(name, contexts):
+                pass
+            bulk = count / (time.perf_counter() - start)
+
+            self.stdout.write(f'{name:<24} {single:>10,.0f} {bulk:>10,.0f} {bulk / single:>7.1f}x')
@@ -0,0 +1,20 @@
+"""
+Management command to delete the actors of past coalescing windows
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from notifications.models import NotificationActor
+from notifications.utils import coalescing_window
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the NotificationActor rows of coalescing windows that have ended '
+        '(run periodically, e.g. hourly)'
+    )
+
+    def handle(self, *args, **options):
+        deleted, _ = NotificationActor.objects.filter(
+            window_start__lt=coalescing_window(timezone.now())
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(f'  ✓ notification actors: {deleted} pruned'))
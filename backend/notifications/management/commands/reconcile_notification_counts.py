@@ -0,0 +1,46 @@
+"""
+Management command to reconcile cached unread notification counts
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from notifications.counters import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the cached unread notification count of every user with the '
+        'database and correct the ones that drifted (run periodically)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted counts, do not fix them',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Users compared per cache and database round trip',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        user_ids = get_user_model().objects.order_by().values_list('id', flat=True)
+        drifted = 0
+        chunk = []
+        for user_id in user_ids.iterator(chunk_size=chunk_size):
+            chunk.append(user_id)
+            if len(chunk) >= chunk_size:
+                drifted += reconcile_unread_counts(chunk, fix=not options['dry_run'])
+                chunk = []
+        if chunk:
+            drifted += reconcile_unread_counts(chunk, fix=not options['dry_run'])
+
+        if not drifted:
+            self.stdout.write('  ✓ unread notification counts: no drift')
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'  ! unread notification counts: {drifted} drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'  ✓ unread notification counts: {drifted} reconciled'))
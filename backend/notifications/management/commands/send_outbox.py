@@ -0,0 +1,41 @@
+"""
+Management command to send queued emails from the outbox
+"""
+import time
+from django.core.management.base import BaseCommand
+from notifications.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Send the due emails of the outbox in batches over one SMTP connection '
+        '(run from cron, or with --loop as a long-running worker)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for due emails instead of exiting',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10,
+            help='Seconds between polls with --loop',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Emails per SMTP connection (default: EMAIL_OUTBOX_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'  ✓ {sent} sent, {failed} failed'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
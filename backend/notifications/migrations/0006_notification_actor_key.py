@@ -0,0 +1,33 @@
+# Generated by Django 4.2.17 on 2026-10-17 01:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0005_notification_actors'),
+    ]
+
+    operations = [
+        # Actors are only needed within the current window; start afresh
+        migrations.DeleteModel(
+            name='NotificationActor',
+        ),
+        migrations.CreateModel(
+            name='NotificationActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(max_length=50)),
+                ('link_id', models.CharField(max_length=255)),
+                ('window_start', models.DateTimeField(db_index=True)),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'notification_type', 'link_id', 'window_start', 'actor')},
+            },
+        ),
+    ]
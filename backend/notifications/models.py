@@ -5,9 +5,16 @@ Handles in-app notifications for user activities
 
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
+ANNOUNCEMENT_AUDIENCES = (
+    ('all', 'All users'),
+    ('course', 'Course enrollees'),
+    ('event', 'Event registrants'),
+)
+
 
 class Notification(models.Model):
     """
@@ -53,7 +60,20 @@ class Notification(models.Model):
         help_text="ID of the linked object (supports both integer and UUID)"
     )
     
+    # Coalesced notifications (see notifications.utils.coalesce_notification)
+    # stand for every event of their type and link within one time window
+    actor_count = models.PositiveIntegerField(
+        default=1,
+        help_text="Number of distinct users whose actions this notification stands for"
+    )
+    window_start = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Start of the coalescing window; empty for single-event notifications"
+    )
+
     is_read = models.BooleanField(default=False)
+    # Moved to the latest event when a notification is coalesced
     created_at = models.DateTimeField(auto_now_add=True)
     read_at = models.DateTimeField(blank=True, null=True)
 
@@ -63,14 +83,90 @@ class Notification(models.Model):
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['user', 'is_read']),
         ]
+        # NULL windows never collide, so only coalesced rows are unique
+        unique_together = ['user', 'notification_type', 'link_id', 'window_start']
 
     def __str__(self):
         return f"{self.user.email} - {self.notification_type} - {self.title}"
 
     def mark_as_read(self):
-        """Mark notification as read"""
-        if not self.is_read:
-            self.is_read = True
-            from django.utils import timezone
-            self.read_at = timezone.now()
-            self.save()
+        """Mark notification as read; returns whether it was unread until now"""
+        if self.is_read:
+            return False
+        self.read_at = timezone.now()
+        # Conditional so that concurrent calls only count one read
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True,
+            read_at=self.read_at
+        )
+        self.is_read = True
+        return bool(updated)
+
+
+class NotificationActor(models.Model):
+    """
+    User who acted on a coalesced notification
+    Keyed like the notification (recipient, type, link, window) rather than
+    by its id, so it can be inserted first and tell whether the actor is
+    new; one row per user however often they act, so "X and N others"
+    counts people. Rows of past windows are removed by the
+    prune_notification_actors command.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    notification_type = models.CharField(max_length=50)
+    link_id = models.CharField(max_length=255)
+    window_start = models.DateTimeField(db_index=True)
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    class Meta:
+        unique_together = ['user', 'notification_type', 'link_id', 'window_start', 'actor']
+
+    def __str__(self):
+        return f"{self.actor_id} - {self.notification_type} {self.link_id}"
+
+
+class OutboxEmail(models.Model):
+    """
+    Email waiting to be sent
+    Requests only insert rows here; notifications.outbox sends them in
+    batches over one SMTP connection and retries failures with backoff
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(help_text="List of recipient addresses")
+    html_body = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # Due time of the next attempt; also pushed forward while a worker
+    # holds the email, so a crashed worker's batch is retried
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{', '.join(self.to)} - {self.subject} ({self.status})"
@@ -0,0 +1,157 @@
+"""
+Durable email outbox
+enqueue_email() stores a rendered email; send_due_emails() sends the due
+ones in batches over a single SMTP connection and reschedules failures with
+exponential backoff. Each commit that enqueues wakes a background sender
+thread, and the send_outbox command drains the outbox from its own process
+(cron or --loop), so mail queued before a restart is still delivered
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# How long a worker holds the emails it claimed before they are due again
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def enqueue_email(subject, to, html_body, from_email=None):
+    """Store an email for sending once the current transaction commits"""
+    email = OutboxEmail.objects.create(
+        subject=subject,
+        to=to,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL
+    )
+    transaction.on_commit(wake_sender)
+    return email
+
+
+def retry_delay(attempts):
+    """Wait after the given number of failed attempts: 1, 2, 4... minutes, capped"""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def claim_due_emails(batch_size):
+    """Lock out the next due emails for this worker and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return batch
+
+
+def record_failure(email, error):
+    """Reschedule a failed email with backoff, or give up after the last attempt"""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error('Giving up on email %s to %s: %s', email.pk, email.to, error)
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+        logger.warning('Email %s to %s failed, retrying: %s', email.pk, email.to, error)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_due_emails(batch_size=None):
+    """
+    Send one batch of due emails over one SMTP connection
+
+    Returns:
+        (sent, failed) counts; (0, 0) when nothing is due
+    """
+    batch = claim_due_emails(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in batch:
+            record_failure(email, error)
+        return 0, len(batch)
+
+    sent = []
+    failed = 0
+    try:
+        for email in batch:
+            message = EmailMultiAlternatives(
+                subject=email.subject,
+                body='',  # Plain text fallback (optional)
+                from_email=email.from_email,
+                to=email.to,
+                connection=connection
+            )
+            message.attach_alternative(email.html_body, "text/html")
+            try:
+                message.send()
+                sent.append(email.pk)
+            except Exception as error:
+                record_failure(email, error)
+                failed += 1
+    finally:
+        connection.close()
+
+    OutboxEmail.objects.filter(pk__in=sent).update(
+        status='sent',
+        sent_at=timezone.now(),
+        attempts=F('attempts') + 1,
+        last_error=''
+    )
+    return len(sent), failed
+
+
+def drain_outbox(batch_size=None):
+    """Send batches until nothing is due; returns total (sent, failed)"""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_due_emails(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
+
+
+def _drain_in_worker():
+    try:
+        drain_outbox()
+    except Exception:
+        logger.exception('Email outbox sender failed')
+    finally:
+        # Connections are per thread; do not leave the worker's open
+        connections.close_all()
+
+
+def wake_sender():
+    """Drain the outbox in a background thread (unless EMAIL_OUTBOX_THREADS = 0)"""
+    global _executor
+    if settings.EMAIL_OUTBOX_THREADS <= 0:
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EMAIL_OUTBOX_THREADS,
+                thread_name_prefix='email-outbox'
+            )
+    _executor.submit(_drain_in_worker)
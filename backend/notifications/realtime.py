@@ -0,0 +1,87 @@
+"""
+Real-time notification delivery
+Each new notification is pushed, once its transaction commits, to the
+channel layer group of its user; every NotificationConsumer the user has
+open relays it, so clients no longer poll unread/ and unread_count/.
+Connections also join one group per audience (all users, each course the
+user is enrolled in, each event they are registered for), so an
+announcement is a single event however many users it reaches.
+"""
+import json
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from .counters import get_unread_count
+from .serializers import NotificationSerializer
+
+# Every connected user is in this group, for announcements to all users
+BROADCAST_GROUP = 'notifications_all'
+
+
+def user_group_name(user_id):
+    """Channel layer group of a user's notification connections"""
+    return f'notifications_{user_id}'
+
+
+def audience_group_name(audience, target_id=None):
+    """Channel layer group of an announcement audience ('all', 'course' or 'event')"""
+    if audience == 'all':
+        return BROADCAST_GROUP
+    return f'notifications_{audience}_{target_id}'
+
+
+def _group_send(group, event):
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(group, event)
+
+
+def _json(payload):
+    # Channel layers only carry plain JSON types (no UUID or datetime)
+    return json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+
+
+def notification_created(notification):
+    """Push a new notification and the user's unread count after commit"""
+    user_id = notification.user_id
+    data = _json(NotificationSerializer(notification).data)
+
+    def send():
+        # Runs after the counter update, so the count includes it
+        _group_send(user_group_name(user_id), {
+            'type': 'notification.created',
+            'notification': data,
+            'unread_count': get_unread_count(user_id),
+        })
+
+    transaction.on_commit(send)
+
+
+def unread_count_changed(user_id):
+    """Push a user's unread count after commit, e.g. once notifications are read"""
+    transaction.on_commit(lambda: _group_send(user_group_name(user_id), {
+        'type': 'notification.unread_count',
+        'unread_count': get_unread_count(user_id),
+    }))
+
+
+def announcement_sent(group, title, message, link_type=None, link_id=None):
+    """Push an announcement to the connections of an audience group after commit"""
+    event = _json({
+        'type': 'notification.announcement',
+        'title': title,
+        'message': message,
+        'link_type': link_type,
+        'link_id': link_id,
+    })
+    transaction.on_commit(lambda: _group_send(group, event))
+
+
+def audience_changed(user_id, group, joined):
+    """Make a user's open connections join or leave an audience group after commit"""
+    transaction.on_commit(lambda: _group_send(user_group_name(user_id), {
+        'type': 'notification.audience',
+        'group': group,
+        'joined': joined,
+    }))
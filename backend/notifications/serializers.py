@@ -3,7 +3,9 @@ Notifications app serializers
 """
 
 from rest_framework import serializers
-from .models import Notification
+from courses.models import Course
+from events.models import Event
+from .models import ANNOUNCEMENT_AUDIENCES, Notification
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -20,11 +22,12 @@ class NotificationSerializer(serializers.ModelSerializer):
             'message',
             'link_type',
             'link_id',
+            'actor_count',
             'is_read',
             'created_at',
             'read_at',
         ]
-        read_only_fields = ['id', 'created_at', 'read_at']
+        read_only_fields = ['id', 'actor_count', 'created_at', 'read_at']
 
 
 class NotificationCreateSerializer(serializers.ModelSerializer):
@@ -42,3 +45,20 @@ class NotificationCreateSerializer(serializers.ModelSerializer):
             'link_type',
             'link_id',
         ]
+
+
+class AnnouncementSerializer(serializers.Serializer):
+    """
+    Serializer for sending an admin announcement to an audience
+    """
+    title = serializers.CharField(max_length=255)
+    message = serializers.CharField()
+    audience = serializers.ChoiceField(choices=ANNOUNCEMENT_AUDIENCES)
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), required=False)
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all(), required=False)
+
+    def validate(self, attrs):
+        audience = attrs['audience']
+        if audience in ('course', 'event') and not attrs.get(audience):
+            raise serializers.ValidationError({audience: f'A {audience} is required for this audience.'})
+        return attrs
@@ -0,0 +1,40 @@
+"""
+Signal handlers for notifications app
+Keep open notification connections in the announcement groups of the
+courses and events their user currently belongs to
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from courses.models import Enrollment
+from events.models import EventRegistration
+from .realtime import audience_changed, audience_group_name
+
+
+@receiver(post_save, sender=Enrollment)
+def update_course_audience(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Join on enrollment, leave on deactivation"""
+    if raw or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    if created and not instance.is_active:
+        return
+    audience_changed(instance.student_id, audience_group_name('course', instance.course_id), instance.is_active)
+
+
+@receiver(post_save, sender=EventRegistration)
+def update_event_audience(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Join on registration, leave on cancellation"""
+    if raw or (update_fields is not None and 'is_cancelled' not in update_fields):
+        return
+    if created and instance.is_cancelled:
+        return
+    audience_changed(instance.attendee_id, audience_group_name('event', instance.event_id), not instance.is_cancelled)
+
+
+@receiver(post_delete, sender=Enrollment)
+def leave_course_audience(sender, instance, **kwargs):
+    audience_changed(instance.student_id, audience_group_name('course', instance.course_id), False)
+
+
+@receiver(post_delete, sender=EventRegistration)
+def leave_event_audience(sender, instance, **kwargs):
+    audience_changed(instance.attendee_id, audience_group_name('event', instance.event_id), False)
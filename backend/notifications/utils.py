@@ -2,7 +2,14 @@
 Utility functions for creating notifications
 """
 
-from .models import Notification
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from .counters import adjust_unread_count, increment_unread_counts
+from .models import Notification, NotificationActor
+from .realtime import announcement_sent, audience_group_name, notification_created
 
 
 def create_notification(user, notification_type, title, message, link_type=None, link_id=None):
@@ -20,7 +27,7 @@ def create_notification(user, notification_type, title, message, link_type=None,
     Returns:
         Notification instance
     """
-    return Notification.objects.create(
+    notification = Notification.objects.create(
         user=user,
         notification_type=notification_type,
         title=title,
@@ -28,6 +35,9 @@ def create_notification(user, notification_type, title, message, link_type=None,
         link_type=link_type,
         link_id=link_id
     )
+    adjust_unread_count(user.pk, 1)
+    notification_created(notification)
+    return notification
 
 
 def notify_course_enrollment(user, course):
@@ -64,30 +74,172 @@ def notify_payment_success(user, amount, item_type, item_title):
     )
 
 
+def coalescing_window(moment):
+    """Start of the NOTIFICATION_COALESCE_WINDOW a moment falls in"""
+    seconds = int(moment.timestamp())
+    seconds -= seconds % settings.NOTIFICATION_COALESCE_WINDOW
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+
+
+def _db_values(model, values):
+    """Field values prepared for raw SQL parameters, in the given order"""
+    return [
+        model._meta.get_field(name).get_db_prep_save(value, connection)
+        for name, value in values.items()
+    ]
+
+
+def _insert_actor(user, actor, notification_type, link_id, window_start):
+    """INSERT ... ON CONFLICT DO NOTHING; returns whether actor is new to the window"""
+    table = connection.ops.quote_name(NotificationActor._meta.db_table)
+    params = _db_values(NotificationActor, {
+        'user': user.pk,
+        'notification_type': notification_type,
+        'link_id': link_id,
+        'window_start': window_start,
+        'actor': actor.pk,
+    })
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (user_id, notification_type, link_id, window_start, actor_id) '
+            'VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING',
+            params
+        )
+        return cursor.rowcount == 1
+
+
+def _upsert_coalesced(user, notification_type, link_type, link_id, window_start, title, message, increment, now):
+    """
+    INSERT ... ON CONFLICT (user, notification_type, link_id, window_start)
+    DO UPDATE, adding increment to actor_count; returns (id, actor_count,
+    is_read) of the row
+    """
+    table = connection.ops.quote_name(Notification._meta.db_table)
+    params = _db_values(Notification, {
+        'user': user.pk,
+        'notification_type': notification_type,
+        'title': title,
+        'message': message,
+        'link_type': link_type,
+        'link_id': link_id,
+        'window_start': window_start,
+        'is_read': False,
+        'created_at': now,
+    })
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} AS n (user_id, notification_type, title, message, link_type, link_id, '
+            'window_start, is_read, created_at, actor_count) '
+            'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 1) '
+            'ON CONFLICT (user_id, notification_type, link_id, window_start) DO UPDATE '
+            'SET actor_count = n.actor_count + %s, created_at = EXCLUDED.created_at '
+            'RETURNING id, actor_count, is_read',
+            params + [increment]
+        )
+        return cursor.fetchone()
+
+
+def coalesce_notification(user, actor, notification_type, link_type, link_id, title, message):
+    """
+    Create a notification, or fold it into the user's notification of the
+    same type and link in the current window
+
+    title and message are callables taking the number of distinct actors,
+    so the text can read "X and 49 others liked your post"; an actor who
+    comments again, or likes after unliking, is not counted twice.
+
+    Every statement commits on its own and no lock is held across them,
+    so likers of a popular post do not queue behind each other: the actor is inserted (or found) with ON
+    CONFLICT DO NOTHING, the notification is upserted with one INSERT ...
+    ON CONFLICT DO UPDATE that grows actor_count only for a new actor, and
+    a coalesced row gets its text rewritten, unless a later event already
+    has, and becomes unread again if it was read.
+
+    Returns:
+        Notification instance
+    """
+    if not settings.NOTIFICATION_COALESCE_WINDOW:
+        return create_notification(user, notification_type, title(1), message(1), link_type, link_id)
+
+    now = timezone.now()
+    window_start = coalescing_window(now)
+    new_actor = _insert_actor(user, actor, notification_type, link_id, window_start)
+    pk, actor_count, is_read = _upsert_coalesced(
+        user, notification_type, link_type, link_id, window_start,
+        title(1), message(1), int(new_actor), now
+    )
+    inserted = new_actor and actor_count == 1
+
+    became_unread = inserted
+    if not inserted:
+        if is_read:
+            became_unread = bool(
+                Notification.objects.filter(pk=pk, is_read=True).update(is_read=False, read_at=None)
+            )
+        # Skipped when a concurrent event has already counted past us
+        Notification.objects.filter(pk=pk, actor_count=actor_count).update(
+            title=title(actor_count),
+            message=message(actor_count)
+        )
+
+    if became_unread:
+        adjust_unread_count(user.pk, 1)
+    notification = Notification(
+        pk=pk,
+        user=user,
+        notification_type=notification_type,
+        title=title(actor_count),
+        message=message(actor_count),
+        link_type=link_type,
+        link_id=link_id,
+        actor_count=actor_count,
+        window_start=window_start,
+        is_read=False,
+        created_at=now
+    )
+    notification_created(notification)
+    return notification
+
+
+def _actors(name, count):
+    """'X', 'X and 1 other' or 'X and N others'"""
+    if count == 1:
+        return name
+    others = count - 1
+    return f'{name} and {others} other{"s" if others > 1 else ""}'
+
+
 def notify_post_like(user, post, liker):
-    """Create notification when someone likes a post"""
+    """Create notification when someone likes a post (coalesced per post)"""
     if user != liker:  # Don't notify if user likes their own post
-        return create_notification(
+        name = liker.get_full_name() or liker.email
+        return coalesce_notification(
             user=user,
+            actor=liker,
             notification_type='post_like',
-            title='New Like',
-            message=f'{liker.get_full_name() or liker.email} liked your post',
             link_type='post',
-            link_id=str(post.id)
+            link_id=str(post.id),
+            title=lambda count: 'New Like' if count == 1 else 'New Likes',
+            message=lambda count: f'{_actors(name, count)} liked your post'
         )
 
 
 def notify_post_comment(user, post, commenter, comment_text):
-    """Create notification when someone comments on a post"""
+    """Create notification when someone comments on a post (coalesced per post)"""
     if user != commenter:  # Don't notify if user comments on their own post
+        name = commenter.get_full_name() or commenter.email
         preview = comment_text[:50] + '...' if len(comment_text) > 50 else comment_text
-        return create_notification(
+        return coalesce_notification(
             user=user,
+            actor=commenter,
             notification_type='post_comment',
-            title='New Comment',
-            message=f'{commenter.get_full_name() or commenter.email} commented: "{preview}"',
             link_type='post',
-            link_id=str(post.id)
+            link_id=str(post.id),
+            title=lambda count: 'New Comment' if count == 1 else 'New Comments',
+            message=lambda count: (
+                f'{name} commented: "{preview}"' if count == 1
+                else f'{_actors(name, count)} commented on your post: "{preview}"'
+            )
         )
 
 
@@ -115,3 +267,70 @@ def notify_event_reminder(user, event):
         link_type='event',
         link_id=event.id
     )
+
+
+def announcement_recipients(audience, course=None, event=None):
+    """
+    Ids of the active users an announcement goes to
+
+    Args:
+        audience: One of ANNOUNCEMENT_AUDIENCES
+        course: Course whose active enrollees are notified (audience 'course')
+        event: Event whose non-cancelled registrants are notified (audience 'event')
+    """
+    users = get_user_model().objects.filter(is_active=True)
+    if audience == 'course':
+        users = users.filter(enrollments__course=course, enrollments__is_active=True)
+    elif audience == 'event':
+        users = users.filter(event_registrations__event=event, event_registrations__is_cancelled=False)
+    elif audience != 'all':
+        raise ValueError(f'Unknown announcement audience: {audience}')
+    return users.order_by().values_list('id', flat=True).distinct()
+
+
+def create_announcement(title, message, audience, course=None, event=None):
+    """
+    Send an admin announcement to every user of an audience
+
+    Rows are written with bulk_create, NOTIFICATION_BATCH_SIZE per INSERT,
+    while the recipient ids are streamed from a server-side cursor, so the
+    cost grows with the number of batches rather than of users. Connected
+    recipients are sent one event on the audience's channel layer group.
+
+    Returns:
+        Number of notifications created
+    """
+    link_type = link_id = None
+    if audience == 'course':
+        link_type, link_id = 'course', str(course.id)
+    elif audience == 'event':
+        link_type, link_id = 'event', str(event.id)
+    group = audience_group_name(audience, link_id)
+
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
+    recipients = announcement_recipients(audience, course, event)
+    created = 0
+    batch = []
+    with transaction.atomic():
+        for user_id in recipients.iterator(chunk_size=batch_size):
+            batch.append(Notification(
+                user_id=user_id,
+                notification_type='admin_announcement',
+                title=title,
+                message=message,
+                link_type=link_type,
+                link_id=link_id
+            ))
+            if len(batch) >= batch_size:
+                created += _insert_announcements(batch)
+                batch = []
+        if batch:
+            created += _insert_announcements(batch)
+        announcement_sent(group, title, message, link_type, link_id)
+    return created
+
+
+def _insert_announcements(batch):
+    Notification.objects.bulk_create(batch)
+    increment_unread_counts([notification.user_id for notification in batch])
+    return len(batch)
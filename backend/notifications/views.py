@@ -2,13 +2,23 @@
 Notifications app views
 """
 
+import time
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from .counters import (
+    adjust_unread_count,
+    get_unread_count,
+    invalidate_unread_counts,
+    reset_unread_count,
+)
+from core.pagination import NewestFirstPagination
 from .models import Notification
-from .serializers import NotificationSerializer
+from .realtime import unread_count_changed
+from .serializers import AnnouncementSerializer, NotificationSerializer
+from .utils import create_announcement
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -22,17 +32,28 @@ class NotificationViewSet(viewsets.ModelViewSet):
         """Return notifications for the current user"""
         return Notification.objects.filter(user=self.request.user)
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_unread_counts([self.request.user.pk])
+        unread_count_changed(self.request.user.pk)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        invalidate_unread_counts([self.request.user.pk])
+        unread_count_changed(self.request.user.pk)
+
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        """Get count of unread notifications"""
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({'unread_count': count})
+        """Get count of unread notifications (served from the cache)"""
+        return Response({'unread_count': get_unread_count(request.user.pk)})
 
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         """Mark a specific notification as read"""
         notification = self.get_object()
-        notification.mark_as_read()
+        if notification.mark_as_read():
+            adjust_unread_count(request.user.pk, -1)
+            unread_count_changed(request.user.pk)
         serializer = self.get_serializer(notification)
         return Response(serializer.data)
 
@@ -44,6 +65,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
             is_read=True,
             read_at=timezone.now()
         )
+        reset_unread_count(request.user.pk)
+        unread_count_changed(request.user.pk)
         return Response({
             'message': f'{count} notifications marked as read',
             'count': count
@@ -61,7 +84,35 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def unread(self, request):
-        """Get only unread notifications"""
-        notifications = self.get_queryset().filter(is_read=False)
+        """
+        Get only unread notifications, newest first, a page at a time
+        Response: {"next": <url or null>, "results": [...]}
+        """
+        paginator = NewestFirstPagination()
+        notifications = paginator.paginate_queryset(
+            self.get_queryset().filter(is_read=False), request, view=self
+        )
         serializer = self.get_serializer(notifications, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def announce(self, request):
+        """
+        Send an announcement to all users, a course's enrollees or an
+        event's registrants (admin/staff only)
+        POST /api/v1/notifications/announce/
+        """
+        if not (request.user.is_admin or request.user.is_staff_member):
+            return Response({
+                'error': 'Only staff can send announcements.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = AnnouncementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        start = time.perf_counter()
+        count = create_announcement(**serializer.validated_data)
+        return Response({
+            'message': f'Announcement sent to {count} users',
+            'count': count,
+            'seconds': round(time.perf_counter() - start, 3)
+        }, status=status.HTTP_201_CREATED)
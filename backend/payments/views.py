@@ -7,11 +7,9 @@ from django.conf import settings
 from django.utils import timezone
 import stripe
 import json
-import io
-import base64
-import qrcode
 
-from courses.models import Course, Enrollment, LessonProgress
+from courses.models import Course, Enrollment
+from courses.services import provision_enrollment
 from events.models import Event, EventRegistration
 from django.contrib.auth import get_user_model
 from notifications.utils import (
@@ -76,38 +74,16 @@ class StripeWebhookView(View):
 
             # Create enrollment if missing
             if user and course and not Enrollment.objects.filter(student=user, course=course, is_active=True).exists():
-                enrollment = Enrollment.objects.create(student=user, course=course)
+                payment_fields = {}
                 if amount_total:
-                    enrollment.paid = True
-                    enrollment.amount_paid = float(amount_total) / 100.0
-                    enrollment.currency = currency.upper()
-                    enrollment.payment_reference = payment_ref
-
-                # Generate QR code only for in-person courses
-                if course.is_in_person:
-                    qr_payload = {
-                        'enrollment_id': str(enrollment.id),
-                        'course_id': str(course.id),
-                        'student_id': str(user.id),
-                        'name': f"{user.get_full_name()}",
-                        'course_title': course.title,
+                    payment_fields = {
+                        'paid': True,
+                        'amount_paid': float(amount_total) / 100.0,
+                        'currency': currency.upper(),
+                        'payment_reference': payment_ref,
                     }
-                    qr_text = str(qr_payload)
-                    qr = qrcode.QRCode(box_size=10, border=4)
-                    qr.add_data(qr_text)
-                    qr.make(fit=True)
-                    img = qr.make_image(fill_color="black", back_color="white")
-                    buffer = io.BytesIO()
-                    img.save(buffer, format='PNG')
-                    buffer.seek(0)
-                    qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                    enrollment.qr_code = qr_b64
-
-                # Create lesson progress entries
-                for lesson in course.lessons.all():
-                    LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
-
-                enrollment.save()
+                # Reactivate or create the enrollment with its lesson progress
+                provision_enrollment(user, course, **payment_fields)
 
         elif obj_type == 'event':
             event_id = metadata.get('event_id')
@@ -124,27 +100,6 @@ class StripeWebhookView(View):
                     registration.currency = currency.upper()
                     registration.payment_reference = payment_ref
 
-                # Generate QR code only for in-person events
-                if ev.is_in_person:
-                    qr_payload = {
-                        'registration_id': str(registration.id),
-                        'event_id': str(ev.id),
-                        'attendee_id': str(user.id),
-                        'name': f"{user.get_full_name()}",
-                        'event_title': ev.title,
-                        'start_date': ev.start_date.isoformat() if ev.start_date else ''
-                    }
-                    qr_text = str(qr_payload)
-                    qr = qrcode.QRCode(box_size=10, border=4)
-                    qr.add_data(qr_text)
-                    qr.make(fit=True)
-                    img = qr.make_image(fill_color="black", back_color="white")
-                    buffer = io.BytesIO()
-                    img.save(buffer, format='PNG')
-                    buffer.seek(0)
-                    qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                    registration.qr_code = qr_b64
-
                 registration.save()
                 
                 # Create notifications
@@ -184,38 +139,16 @@ class StripeWebhookView(View):
 
             # Create enrollment if missing
             if not Enrollment.objects.filter(student=user, course=course, is_active=True).exists():
-                enrollment = Enrollment.objects.create(student=user, course=course)
+                payment_fields = {}
                 if amount_total:
-                    enrollment.paid = True
-                    enrollment.amount_paid = float(amount_total) / 100.0
-                    enrollment.currency = currency.upper()
-                    enrollment.payment_reference = payment_ref
-
-                # Generate QR code only for in-person courses
-                if course.is_in_person:
-                    qr_payload = {
-                        'enrollment_id': str(enrollment.id),
-                        'course_id': str(course.id),
-                        'student_id': str(user.id),
-                        'name': f"{user.get_full_name()}",
-                        'course_title': course.title,
+                    payment_fields = {
+                        'paid': True,
+                        'amount_paid': float(amount_total) / 100.0,
+                        'currency': currency.upper(),
+                        'payment_reference': payment_ref,
                     }
-                    qr_text = str(qr_payload)
-                    qr = qrcode.QRCode(box_size=10, border=4)
-                    qr.add_data(qr_text)
-                    qr.make(fit=True)
-                    img = qr.make_image(fill_color="black", back_color="white")
-                    buffer = io.BytesIO()
-                    img.save(buffer, format='PNG')
-                    buffer.seek(0)
-                    qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                    enrollment.qr_code = qr_b64
-
-                # Create lesson progress entries
-                for lesson in course.lessons.all():
-                    LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
-
-                enrollment.save()
+                # Reactivate or create the enrollment with its lesson progress
+                provision_enrollment(user, course, **payment_fields)
 
         elif obj_type == 'event':
             event_id = metadata.get('event_id')
@@ -232,25 +165,4 @@ class StripeWebhookView(View):
                     registration.currency = currency.upper()
                     registration.payment_reference = payment_ref
 
-                # Generate QR code only for in-person events
-                if ev.is_in_person:
-                    qr_payload = {
-                        'registration_id': str(registration.id),
-                        'event_id': str(ev.id),
-                        'attendee_id': str(user.id),
-                        'name': f"{user.get_full_name()}",
-                        'event_title': ev.title,
-                        'start_date': ev.start_date.isoformat() if ev.start_date else ''
-                    }
-                    qr_text = str(qr_payload)
-                    qr = qrcode.QRCode(box_size=10, border=4)
-                    qr.add_data(qr_text)
-                    qr.make(fit=True)
-                    img = qr.make_image(fill_color="black", back_color="white")
-                    buffer = io.BytesIO()
-                    img.save(buffer, format='PNG')
-                    buffer.seek(0)
-                    qr_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                    registration.qr_code = qr_b64
-
                 registration.save()
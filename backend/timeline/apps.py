@@ -5,3 +5,6 @@ class TimelineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'timeline'
     verbose_name = 'Timeline'
+
+    def ready(self):
+        from . import signals  # noqa: F401
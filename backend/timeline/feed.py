@@ -0,0 +1,186 @@
+"""
+Materialized home feed for timeline app
+Post ids are pushed into a sorted set when posts are created (fan-out on
+write) and trimmed to TIMELINE_FEED_DEPTH, so the first page of the feed
+is read from the set and hydrated with one query instead of sorting the
+posts table on every refresh
+"""
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class FeedUnavailable(Exception):
+    """Raised when the feed store cannot be reached"""
+
+
+def feed_score(created_at):
+    """Sort score of a post: its creation time in whole microseconds"""
+    return (created_at - EPOCH) // timedelta(microseconds=1)
+
+
+class InMemoryFeed:
+    """
+    In-process stand-in for RedisFeed, for tests and single-process
+    development; every process holds its own copy
+    """
+
+    def __init__(self, depth):
+        self.depth = depth
+        self._scores = {}
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def add(self, member, score):
+        with self._lock:
+            self._scores[member] = score
+            if len(self._scores) > self.depth:
+                self._scores = dict(self._ranked()[:self.depth])
+
+    def remove(self, member):
+        with self._lock:
+            self._scores.pop(member, None)
+
+    def top(self, count):
+        """Newest members, or None until the feed has been rebuilt"""
+        with self._lock:
+            if not self._ready:
+                return None
+            return [member for member, _ in self._ranked()[:count]]
+
+    def rebuild(self, entries):
+        with self._lock:
+            self._scores.update(entries)
+            self._scores = dict(self._ranked()[:self.depth])
+            self._ready = True
+
+    def _ranked(self):
+        # Same order as the database: (created_at, id) descending
+        return sorted(self._scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+
+class RedisFeed:
+    """
+    Feed kept in a Redis sorted set. A sentinel member with an infinite
+    score marks a complete feed; without it (new or evicted key) the feed
+    is rebuilt from the database on the next read
+    """
+    key = 'timeline:feed'
+    sentinel = '~ready'
+
+    def __init__(self, url, depth):
+        import redis
+
+        self.depth = depth
+        self.errors = (redis.RedisError,)
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _run(self, pipeline):
+        try:
+            return pipeline.execute()
+        except self.errors as exc:
+            raise FeedUnavailable(str(exc)) from exc
+
+    def add(self, member, score):
+        pipeline = self.client.pipeline()
+        pipeline.zadd(self.key, {member: score})
+        # Keep the sentinel plus the newest `depth` posts
+        pipeline.zremrangebyrank(self.key, 0, -(self.depth + 2))
+        self._run(pipeline)
+
+    def remove(self, member):
+        pipeline = self.client.pipeline()
+        pipeline.zrem(self.key, member)
+        self._run(pipeline)
+
+    def top(self, count):
+        """Newest members, or None until the feed has been rebuilt"""
+        pipeline = self.client.pipeline()
+        pipeline.zrevrange(self.key, 0, count)
+        members = self._run(pipeline)[0]
+        if not members or members[0] != self.sentinel:
+            return None
+        return members[1:]
+
+    def rebuild(self, entries):
+        # Merge rather than replace, so posts pushed meanwhile are kept
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.zadd(self.key, {self.sentinel: float('inf'), **dict(entries)})
+        pipeline.zremrangebyrank(self.key, 0, -(self.depth + 2))
+        self._run(pipeline)
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_feed():
+    """
+    Feed store configured by TIMELINE_FEED_URL: a Redis URL, 'memory://'
+    for the in-process stand-in, or empty (None) to read the database
+    """
+    url = settings.TIMELINE_FEED_URL
+    if not url:
+        return None
+    depth = settings.TIMELINE_FEED_DEPTH
+    with _feeds_lock:
+        if (url, depth) not in _feeds:
+            if url.startswith('memory://'):
+                _feeds[url, depth] = InMemoryFeed(depth)
+            else:
+                _feeds[url, depth] = RedisFeed(url, depth)
+        return _feeds[url, depth]
+
+
+def push_post(post):
+    """Add a newly created post to the feed"""
+    feed = get_feed()
+    if feed is None:
+        return
+    try:
+        feed.add(str(post.pk), feed_score(post.created_at))
+    except FeedUnavailable:
+        logger.warning('Timeline feed unavailable, post %s not pushed', post.pk)
+
+
+def remove_post(post_id):
+    """Drop a deleted post from the feed"""
+    feed = get_feed()
+    if feed is None:
+        return
+    try:
+        feed.remove(str(post_id))
+    except FeedUnavailable:
+        logger.warning('Timeline feed unavailable, post %s not removed', post_id)
+
+
+def feed_page(count):
+    """
+    Ids of the newest `count` posts, newest first
+
+    Rebuilds a cold feed from the database with one query. Returns None
+    when the feed is disabled or unreachable, so callers query the
+    database directly.
+    """
+    feed = get_feed()
+    if feed is None:
+        return None
+    try:
+        members = feed.top(count)
+        if members is None:
+            rows = Post.objects.order_by('-created_at', '-id').values_list('id', 'created_at')
+            entries = [(str(pk), feed_score(created_at)) for pk, created_at in rows[:feed.depth]]
+            feed.rebuild(entries)
+            members = [member for member, _ in entries[:count]]
+    except FeedUnavailable:
+        logger.warning('Timeline feed unavailable, reading posts from the database')
+        return None
+    return [uuid.UUID(member) for member in members]
@@ -0,0 +1,107 @@
+"""
+Management command to benchmark timeline page latency at growing scroll depths
+"""
+import time
+import uuid
+from urllib.parse import parse_qs, urlparse
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from accounts.models import User
+from core.pagination import NewestFirstPagination
+from timeline.models import Post
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare page-number (OFFSET + COUNT) and keyset pagination of the '
+        'timeline at growing depths (all data is rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=20000,
+            help='Posts to create',
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            nargs='+',
+            default=[1, 10, 100, 500, 900],
+            help='Page numbers to measure (must fit within --posts)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Requests per page and strategy',
+        )
+
+    def handle(self, *args, **options):
+        self.factory = APIRequestFactory()
+        self.stdout.write(f'{"page":>6} {"offset ms":>10} {"keyset ms":>10} {"queries":>8}')
+        try:
+            with transaction.atomic():
+                self._seed(options['posts'])
+                for page in options['pages']:
+                    self._run(page, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _seed(self, count):
+        suffix = uuid.uuid4().hex[:12]
+        author = User.objects.create(
+            username=f'bench-author-{suffix}',
+            email=f'bench-author-{suffix}@example.com',
+        )
+        Post.objects.bulk_create(
+            (Post(author=author, content=f'Benchmark post {n}') for n in range(count)),
+            batch_size=1000
+        )
+
+    def _request(self, params):
+        return Request(self.factory.get('/api/v1/posts/', params))
+
+    def _time(self, paginate, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            paginate()
+            timings.append((time.perf_counter() - start) * 1000)
+        return sum(timings) / len(timings)
+
+    def _run(self, page, repeat):
+        queryset = Post.objects.all()
+
+        offset = PageNumberPagination()
+        offset_ms = self._time(
+            lambda: offset.paginate_queryset(queryset, self._request({'page': page})),
+            repeat
+        )
+
+        # Walk to the page once to get the cursor a scrolling client would hold
+        keyset = NewestFirstPagination()
+        params = {}
+        for _ in range(page - 1):
+            keyset.paginate_queryset(queryset, self._request(params))
+            params = parse_qs(urlparse(keyset.get_next_link()).query)
+        with CaptureQueriesContext(connection) as queries:
+            keyset_ms = self._time(
+                lambda: keyset.paginate_queryset(queryset, self._request(params)),
+                repeat
+            )
+
+        self.stdout.write(
+            f'{page:>6} {offset_ms:>10.2f} {keyset_ms:>10.2f} '
+            f'{len(queries.captured_queries) // repeat:>8}'
+        )
@@ -0,0 +1,30 @@
+"""
+Management command to build missing post and chat message image variants
+"""
+from django.core.management.base import BaseCommand
+from chat.models import Message
+from core.images import build_image_variants, variants_are_stale
+from timeline.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the WebP variants of post and chat message images that have '
+        'none or outdated ones (e.g. jobs lost in a restart, or existing uploads)'
+    )
+
+    def handle(self, *args, **options):
+        for model in (Post, Message):
+            label = model._meta.verbose_name_plural
+            rows = model.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image', 'image_variants')
+            built = failed = 0
+            for instance in rows.iterator():
+                if not variants_are_stale(instance):
+                    continue
+                try:
+                    build_image_variants(model, instance.pk)
+                    built += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f'  ! {label} {instance.pk}: {exc}'))
+            self.stdout.write(self.style.SUCCESS(f'  ✓ {label}: {built} built, {failed} failed'))
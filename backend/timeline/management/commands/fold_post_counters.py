@@ -0,0 +1,16 @@
+"""
+Management command to fold sharded like/comment deltas onto posts
+"""
+from django.core.management.base import BaseCommand
+from timeline.services import fold_post_counter_shards
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply pending PostCounterShard deltas to Post.likes_count and '
+        'Post.comments_count (run periodically when TIMELINE_COUNTER_SHARDS > 0)'
+    )
+
+    def handle(self, *args, **options):
+        folded = fold_post_counter_shards()
+        self.stdout.write(self.style.SUCCESS(f'  ✓ {folded} posts updated'))
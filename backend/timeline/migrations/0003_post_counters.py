@@ -0,0 +1,56 @@
+# Generated by Django 4.2.17 on 2026-10-17 00:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_post_counters(apps, schema_editor):
+    Post = apps.get_model('timeline', 'Post')
+    Like = apps.get_model('timeline', 'Like')
+    Comment = apps.get_model('timeline', 'Comment')
+
+    def per_post(model):
+        return Coalesce(Subquery(
+            model.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post').annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    Post.objects.update(likes_count=per_post(Like), comments_count=per_post(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeline', '0002_post_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Comments, maintained by timeline.signals'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Likes, maintained by timeline.signals'),
+        ),
+        migrations.CreateModel(
+            name='PostCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.UUIDField()),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('likes_delta', models.IntegerField(default=0)),
+                ('comments_delta', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Post Counter Shard',
+                'verbose_name_plural': 'Post Counter Shards',
+                'db_table': 'post_counter_shards',
+                'unique_together': {('post_id', 'shard')},
+            },
+        ),
+        migrations.RunPython(backfill_post_counters, migrations.RunPython.noop),
+    ]
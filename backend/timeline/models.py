@@ -6,6 +6,17 @@ from django.db import models
 from django.conf import settings
 
 
+class PostQuerySet(models.QuerySet):
+    """QuerySet helpers for Post"""
+
+    def with_counts(self):
+        """
+        Join the author; like/comment counts are stored on the row, so a
+        page of posts is serialized without per-post COUNT or author queries
+        """
+        return self.select_related('author')
+
+
 class Post(models.Model):
     """
     Post model for timeline/social feed
@@ -19,25 +30,35 @@ class Post(models.Model):
     )
     content = models.TextField()
     image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    # WebP variants of image, built in the background by core.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    likes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Likes, maintained by timeline.signals'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Comments, maintained by timeline.signals'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PostQuerySet.as_manager()
+    
     class Meta:
         db_table = 'posts'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the feed on (created_at, id)
+            models.Index(fields=['-created_at', '-id']),
+        ]
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
     
     def __str__(self):
         return f"{self.author.get_full_name()} - {self.content[:50]}"
-    
-    @property
-    def likes_count(self):
-        return self.likes.count()
-    
-    @property
-    def comments_count(self):
-        return self.comments.count()
 
 
 class Comment(models.Model):
@@ -59,6 +80,10 @@ class Comment(models.Model):
     class Meta:
         db_table = 'comments'
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a post's comments on (created_at, id)
+            models.Index(fields=['post', 'created_at', 'id']),
+        ]
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
     
@@ -90,3 +115,25 @@ class Like(models.Model):
     
     def __str__(self):
         return f"{self.user.get_full_name()} likes {self.post.id}"
+
+
+class PostCounterShard(models.Model):
+    """
+    Pending like/comment deltas for a post in sharded counter mode
+    (TIMELINE_COUNTER_SHARDS > 0), folded onto Post by fold_post_counters
+    """
+    
+    # Not a foreign key: a shard may outlive a post deleted mid-write
+    post_id = models.UUIDField()
+    shard = models.PositiveSmallIntegerField()
+    likes_delta = models.IntegerField(default=0)
+    comments_delta = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'post_counter_shards'
+        unique_together = ['post_id', 'shard']
+        verbose_name = 'Post Counter Shard'
+        verbose_name_plural = 'Post Counter Shards'
+    
+    def __str__(self):
+        return f"Post {self.post_id} shard {self.shard}"
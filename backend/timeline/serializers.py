@@ -1,9 +1,11 @@
 """
 Serializers for timeline app
 """
+from django.db import models
 from rest_framework import serializers
 from .models import Post, Comment, Like
 from accounts.serializers import UserSerializer
+from core.images import image_variant_urls
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -47,30 +49,57 @@ class LikeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at']
 
 
+class PostPageSerializer(serializers.ListSerializer):
+    """
+    List serializer for posts that resolves is_liked_by_user for the whole
+    page with one IN query instead of one EXISTS query per post
+    """
+    
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.Manager) else data)
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            self.context['liked_post_ids'] = set(
+                Like.objects.filter(user=request.user, post__in=posts)
+                .values_list('post_id', flat=True)
+            )
+        return super().to_representation(posts)
+
+
+def _is_liked_by_user(serializer, post):
+    # Set by PostPageSerializer when serializing a list
+    liked_post_ids = serializer.context.get('liked_post_ids')
+    if liked_post_ids is not None:
+        return post.pk in liked_post_ids
+    request = serializer.context.get('request')
+    if request and request.user.is_authenticated:
+        return Like.objects.filter(post=post, user=request.user).exists()
+    return False
+
+
 class PostSerializer(serializers.ModelSerializer):
     """
     Serializer for Post model
     """
     author = UserSerializer(read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
-    likes_count = serializers.IntegerField(read_only=True)
-    comments_count = serializers.IntegerField(read_only=True)
     is_liked_by_user = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
         fields = [
-            'id', 'author', 'content', 'image',
+            'id', 'author', 'content', 'image', 'image_variants',
             'likes_count', 'comments_count', 'is_liked_by_user',
-            'comments', 'created_at', 'updated_at'
+            'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'author', 'created_at', 'updated_at']
+        list_serializer_class = PostPageSerializer
     
     def get_is_liked_by_user(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Like.objects.filter(post=obj, user=request.user).exists()
-        return False
+        return _is_liked_by_user(self, obj)
+    
+    def get_image_variants(self, obj):
+        return image_variant_urls(obj, self.context.get('request'))
 
 
 class PostListSerializer(serializers.ModelSerializer):
@@ -78,24 +107,24 @@ class PostListSerializer(serializers.ModelSerializer):
     Serializer for Post list view (without comments)
     """
     author = UserSerializer(read_only=True)
-    likes_count = serializers.IntegerField(read_only=True)
-    comments_count = serializers.IntegerField(read_only=True)
     is_liked_by_user = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
         fields = [
-            'id', 'author', 'content', 'image',
+            'id', 'author', 'content', 'image', 'image_variants',
             'likes_count', 'comments_count', 'is_liked_by_user',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'author', 'created_at', 'updated_at']
+        list_serializer_class = PostPageSerializer
     
     def get_is_liked_by_user(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Like.objects.filter(post=obj, user=request.user).exists()
-        return False
+        return _is_liked_by_user(self, obj)
+    
+    def get_image_variants(self, obj):
+        return image_variant_urls(obj, self.context.get('request'))
 
 
 class PostCreateSerializer(serializers.ModelSerializer):
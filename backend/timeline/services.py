@@ -0,0 +1,76 @@
+"""
+Like and comment counter maintenance for timeline app
+"""
+import random
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from .models import Post, PostCounterShard
+
+# Post counter -> PostCounterShard delta column
+SHARD_FIELDS = {
+    'likes_count': 'likes_delta',
+    'comments_count': 'comments_delta',
+}
+
+
+def adjust_post_counter(post_id, field, delta):
+    """
+    Apply a like/comment delta to a post
+
+    By default this is one atomic UPDATE on the post row. With
+    TIMELINE_COUNTER_SHARDS > 0 the delta goes to one of that many shard
+    rows picked at random, so concurrent likers of a viral post do not all
+    queue on the post's row lock; fold_post_counter_shards() later moves
+    the pending deltas onto the post.
+    """
+    shards = settings.TIMELINE_COUNTER_SHARDS
+    if not shards:
+        posts = Post.objects.filter(pk=post_id)
+        if delta < 0:
+            posts = posts.filter(**{f'{field}__gt': 0})
+        posts.update(**{field: F(field) + delta})
+        return
+
+    shard_field = SHARD_FIELDS[field]
+    shard_number = random.randrange(shards)
+    shard = PostCounterShard.objects.filter(post_id=post_id, shard=shard_number)
+    if not shard.update(**{shard_field: F(shard_field) + delta}):
+        # First write to this shard: create it (or lose the race), then apply
+        PostCounterShard.objects.bulk_create(
+            [PostCounterShard(post_id=post_id, shard=shard_number)],
+            ignore_conflicts=True
+        )
+        shard.update(**{shard_field: F(shard_field) + delta})
+
+
+def fold_post_counter_shards():
+    """
+    Move pending shard deltas onto their posts
+
+    Shards locked by a concurrent writer are skipped and picked up by the
+    next run. Returns the number of posts updated.
+    """
+    with transaction.atomic():
+        shard_ids = list(
+            PostCounterShard.objects.select_for_update(skip_locked=True)
+            .values_list('pk', flat=True)
+        )
+        if not shard_ids:
+            return 0
+
+        pending = PostCounterShard.objects.filter(pk__in=shard_ids).values('post_id').annotate(
+            likes=Sum('likes_delta'),
+            comments=Sum('comments_delta')
+        )
+        updated = 0
+        for row in pending:
+            if not row['likes'] and not row['comments']:
+                continue
+            updated += Post.objects.filter(pk=row['post_id']).update(
+                likes_count=Greatest(F('likes_count') + row['likes'], 0),
+                comments_count=Greatest(F('comments_count') + row['comments'], 0)
+            )
+        PostCounterShard.objects.filter(pk__in=shard_ids).delete()
+    return updated
@@ -0,0 +1,90 @@
+"""
+Signal handlers for timeline app
+Keep Post.likes_count and Post.comments_count in sync with likes and comments,
+the materialized feed in sync with posts, and post image variants built
+"""
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from core.images import schedule_image_variants
+from .feed import push_post, remove_post
+from .models import Post, Comment, Like
+from .services import adjust_post_counter
+
+# Post counter maintained for each model
+COUNTERS = {
+    Like: 'likes_count',
+    Comment: 'comments_count',
+}
+
+# Marker for instances loaded without post_id (e.g. .only())
+UNKNOWN = object()
+
+
+def _counted_post_id(instance):
+    """Return the post a like/comment counts towards"""
+    return instance.__dict__.get('post_id', UNKNOWN)
+
+
+def _adjust(instance, post_id, delta):
+    field = COUNTERS[type(instance)]
+    adjust_post_counter(post_id, field, delta)
+    # Mirror the change on an already loaded post instance
+    if type(instance).post.is_cached(instance) and instance.post.pk == post_id:
+        setattr(instance.post, field, max(getattr(instance.post, field) + delta, 0))
+
+
+@receiver(post_init, sender=Like)
+@receiver(post_init, sender=Comment)
+def remember_post(sender, instance, **kwargs):
+    """Remember the loaded post so saves can tell what changed"""
+    instance._counted_post_id = _counted_post_id(instance)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+def update_post_counter_on_save(sender, instance, created, raw=False, **kwargs):
+    """Count new likes/comments, and comments moved to another post"""
+    if raw:
+        return
+    before = None if created else instance._counted_post_id
+    after = _counted_post_id(instance)
+    instance._counted_post_id = after
+    if before == after or before is UNKNOWN or after is UNKNOWN:
+        return
+    if before:
+        _adjust(instance, before, -1)
+    if after:
+        _adjust(instance, after, 1)
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+def update_post_counter_on_delete(sender, instance, origin=None, **kwargs):
+    """Uncount deleted likes/comments, unless their post is being deleted"""
+    if isinstance(origin, Post) or getattr(origin, 'model', None) is Post:
+        return
+    before = instance._counted_post_id
+    if before and before is not UNKNOWN:
+        _adjust(instance, before, -1)
+
+
+@receiver(post_save, sender=Post)
+def push_post_to_feed(sender, instance, created, raw=False, **kwargs):
+    """Fan a new post out to the feed once it is committed"""
+    if created and not raw:
+        transaction.on_commit(lambda: push_post(instance))
+
+
+@receiver(post_save, sender=Post)
+def build_post_image_variants(sender, instance, raw=False, **kwargs):
+    """Render the variants of a new or replaced post image in the background"""
+    if not raw:
+        schedule_image_variants(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_feed(sender, instance, **kwargs):
+    """Drop a deleted post from the feed once the delete is committed"""
+    post_id = instance.pk
+    transaction.on_commit(lambda: remove_post(post_id))
@@ -5,6 +5,7 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from .models import Post, Comment, Like
 from .serializers import (
     PostSerializer,
@@ -15,6 +16,8 @@ from .serializers import (
     LikeSerializer
 )
 from notifications.utils import notify_post_like, notify_post_comment
+from .feed import feed_page
+from core.pagination import NewestFirstPagination
 
 
 class PostViewSet(viewsets.ModelViewSet):
@@ -24,6 +27,11 @@ class PostViewSet(viewsets.ModelViewSet):
     """
     queryset = Post.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = NewestFirstPagination
+    
+    # Latest comments embedded in the post detail; ?comments=N overrides
+    embedded_comments = 10
+    max_embedded_comments = 50
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -33,7 +41,7 @@ class PostViewSet(viewsets.ModelViewSet):
         return PostSerializer
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().with_counts()
         
         # Filter by author
         author_id = self.request.query_params.get('author', None)
@@ -42,6 +50,49 @@ class PostViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        """Serve the first page of the unfiltered feed from the materialized feed."""
+        paginator = self.paginator
+        params = request.query_params
+        if not params.get(paginator.cursor_query_param) and not params.get('author'):
+            page_size = paginator.get_page_size(request)
+            post_ids = feed_page(page_size + 1)
+            if post_ids is not None:
+                # Hydrate the page by primary key in one query, in feed order
+                posts = self.get_queryset().in_bulk(post_ids[:page_size])
+                page = paginator.paginate_prefetched(
+                    [posts[pk] for pk in post_ids[:page_size] if pk in posts],
+                    len(post_ids) > page_size,
+                    request
+                )
+                serializer = self.get_serializer(page, many=True)
+                return paginator.get_paginated_response(serializer.data)
+        
+        return super().list(request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Embed the latest comments and a cursor to the older ones."""
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        data = serializer.data
+        
+        try:
+            limit = int(request.query_params.get('comments', self.embedded_comments))
+        except ValueError:
+            limit = self.embedded_comments
+        limit = max(0, min(limit, self.max_embedded_comments))
+        
+        if limit:
+            paginator = NewestFirstPagination()
+            comments = paginator.paginate_first_page(
+                instance.comments.select_related('author'),
+                request.build_absolute_uri(reverse('timeline:post-comments', args=[instance.pk])),
+                limit
+            )
+            data['comments'] = paginator.get_paginated_data(CommentSerializer(comments, many=True).data)
+        
+        return Response(data)
+    
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
     
@@ -66,7 +117,7 @@ class PostViewSet(viewsets.ModelViewSet):
         post = self.get_object()
         user = request.user
         
-        # Check if already liked
+        # Check if already liked (a new like also updates post.likes_count)
         like, created = Like.objects.get_or_create(post=post, user=user)
         
         if created:
@@ -93,7 +144,9 @@ class PostViewSet(viewsets.ModelViewSet):
         user = request.user
         
         try:
-            like = Like.objects.get(post=post, user=user)
+            # Through the post's manager so the like holds this post
+            # instance, and the delete signal mirrors the -1 on it
+            like = post.likes.get(user=user)
             like.delete()
             
             return Response({
@@ -108,13 +161,18 @@ class PostViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticatedOrReadOnly])
     def comments(self, request, pk=None):
         """
-        Get all comments for a post
-        GET /api/v1/posts/{id}/comments/
+        Get the comments of a post, newest first, paginated by cursor
+        GET /api/v1/posts/{id}/comments/?cursor=...
         """
         post = self.get_object()
-        comments = post.comments.all()
+        paginator = NewestFirstPagination()
+        comments = paginator.paginate_queryset(
+            post.comments.select_related('author'),
+            request,
+            view=self
+        )
         serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def add_comment(self, request, pk=None):
@@ -142,9 +200,12 @@ class PostViewSet(viewsets.ModelViewSet):
 class CommentViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Comment model
+    Lists newest first, like the comments embedded in a post and
+    posts/{id}/comments/
     """
     queryset = Comment.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = NewestFirstPagination
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -152,7 +213,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         return CommentSerializer
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('author')
         
         # Filter by post
         post_id = self.request.query_params.get('post', None)
@@ -2,8 +2,12 @@
  * Chat API service
  */
 
+import AsyncStorage from '@react-native-async-storage/async-storage';
 import apiClient from './client';
-import { ENDPOINTS } from './config';
+import { API_BASE_URL, ENDPOINTS } from './config';
+
+// https://host/api/v1 -> wss://host
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws').replace(/\/api\/v1\/?$/, '');
 
 export const chatService = {
   /**
@@ -23,10 +27,12 @@ export const chatService = {
   },
 
   /**
-   * Get messages for a chat room
+   * Get messages for a chat room, newest first: { results, next, sync }
+   * Pass a previous response's `next` URL to load older messages, or its
+   * `sync` URL to load only the messages sent since (oldest first)
    */
-  getMessages: async (roomId) => {
-    const response = await apiClient.get(ENDPOINTS.CHAT.MESSAGES(roomId));
+  getMessages: async (roomId, pageUrl = null) => {
+    const response = await apiClient.get(pageUrl || ENDPOINTS.CHAT.MESSAGES(roomId));
     return response.data;
   },
 
@@ -82,4 +88,32 @@ export const chatService = {
     });
     return response.data;
   },
+
+  /**
+   * Open a live connection to a chat room instead of polling getMessages
+   * onEvent receives { type: 'message' | 'typing' | 'read', ... }
+   * Returns the WebSocket; use sendTyping / sendRead on it, close() when done
+   */
+  connectToRoom: async (roomId, onEvent) => {
+    const token = await AsyncStorage.getItem('access_token');
+    const socket = new WebSocket(
+      `${WS_BASE_URL}/ws/chat/${roomId}/?token=${encodeURIComponent(token)}`
+    );
+    socket.onmessage = (event) => onEvent(JSON.parse(event.data));
+    return socket;
+  },
+
+  /**
+   * Tell the other participants whether the user is typing
+   */
+  sendTyping: (socket, isTyping = true) => {
+    socket.send(JSON.stringify({ type: 'typing', is_typing: isTyping }));
+  },
+
+  /**
+   * Mark the room as read over the live connection
+   */
+  sendRead: (socket) => {
+    socket.send(JSON.stringify({ type: 'read' }));
+  },
 };
@@ -178,4 +178,12 @@ export const coursesService = {
     const response = await apiClient.get(`${ENDPOINTS.ENROLLMENTS.LIST}${enrollmentId}/`);
     return response.data;
   },
+
+  /**
+   * Check in a scanned course ticket (admin/staff only)
+   */
+  checkInEnrollment: async (code) => {
+    const response = await apiClient.post(`${ENDPOINTS.ENROLLMENTS.LIST}check-in/`, { code });
+    return response.data;
+  },
 };
@@ -97,4 +97,32 @@ export const eventsService = {
     const response = await apiClient.get(`${ENDPOINTS.EVENT_REGISTRATIONS.LIST}${registrationId}/`);
     return response.data;
   },
+
+  /**
+   * Check in a scanned event ticket (admin/staff only)
+   */
+  checkInRegistration: async (code) => {
+    const response = await apiClient.post(`${ENDPOINTS.EVENT_REGISTRATIONS.LIST}check-in/`, { code });
+    return response.data;
+  },
+
+  /**
+   * Download the offline check-in manifest of an event (admin/staff only)
+   * Newline-delimited JSON: a header line, then one line per valid ticket
+   */
+  getCheckInManifest: async (eventId) => {
+    const response = await apiClient.get(`${ENDPOINTS.EVENTS.DETAIL(eventId)}check-in-manifest/`, {
+      responseType: 'text',
+    });
+    const [header, ...tickets] = response.data.trim().split('\n').map((line) => JSON.parse(line));
+    return { ...header, tickets };
+  },
+
+  /**
+   * Upload ticket codes scanned offline (admin/staff only)
+   */
+  uploadCheckIns: async (eventId, codes) => {
+    const response = await apiClient.post(`${ENDPOINTS.EVENTS.DETAIL(eventId)}check-in-batch/`, { codes });
+    return response.data;
+  },
 };
@@ -3,7 +3,12 @@
  * Handles all notification-related API calls
  */
 
+import AsyncStorage from '@react-native-async-storage/async-storage';
 import apiClient from './client';
+import { API_BASE_URL } from './config';
+
+// ws(s)://host of the API, for live notifications
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws').replace(/\/api\/v1\/?$/, '');
 
 const notificationsService = {
   /**
@@ -15,10 +20,11 @@ const notificationsService = {
   },
 
   /**
-   * Get only unread notifications
+   * Get unread notifications a page at a time: { next, results }
+   * Pass the previous response's next URL to load the following page
    */
-  getUnreadNotifications: async () => {
-    const response = await apiClient.get('/notifications/unread/');
+  getUnreadNotifications: async (next = null) => {
+    const response = await apiClient.get(next || '/notifications/unread/');
     return response.data;
   },
 
@@ -30,6 +36,20 @@ const notificationsService = {
     return response.data;
   },
 
+  /**
+   * Open a live connection instead of polling getUnreadNotifications / getUnreadCount
+   * onEvent receives { type: 'notification' | 'announcement' | 'unread_count', ... }
+   * Returns the WebSocket; close() it when done
+   */
+  connectToNotifications: async (onEvent) => {
+    const token = await AsyncStorage.getItem('access_token');
+    const socket = new WebSocket(
+      `${WS_BASE_URL}/ws/notifications/?token=${encodeURIComponent(token)}`
+    );
+    socket.onmessage = (event) => onEvent(JSON.parse(event.data));
+    return socket;
+  },
+
   /**
    * Mark a specific notification as read
    */
@@ -62,10 +62,11 @@ export const timelineService = {
   },
 
   /**
-   * Get comments for a post
+   * Get comments for a post, newest first: { results, next }
+   * Pass the previous page's `next` URL to load older comments
    */
-  getComments: async (postId) => {
-    const response = await apiClient.get(ENDPOINTS.POSTS.COMMENTS(postId));
+  getComments: async (postId, nextUrl = null) => {
+    const response = await apiClient.get(nextUrl || ENDPOINTS.POSTS.COMMENTS(postId));
     return response.data;
   },
 
@@ -56,7 +56,7 @@ const ChatBubble = ({ message, isOwnMessage, showAvatar = true }) => {
 
         {message.image && (
           <Image
-            source={{ uri: message.image }}
+            source={{ uri: message.image_variants?.thumbnail || message.image }}
             style={styles.messageImage}
             resizeMode="cover"
           />
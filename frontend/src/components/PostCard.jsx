@@ -42,7 +42,7 @@ const PostCard = ({ post, onPress, onLike, onComment }) => {
 
       {post.image && (
         <Image
-          source={{ uri: post.image }}
+          source={{ uri: post.image_variants?.thumbnail || post.image }}
           style={styles.postImage}
           resizeMode="cover"
         />
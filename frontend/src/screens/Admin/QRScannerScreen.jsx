@@ -43,62 +43,29 @@ const QRScannerScreen = ({ navigation }) => {
     setLoading(true);
 
     try {
-      // Parse QR code data - it's a dictionary string like "{'enrollment_id': 'uuid', ...}"
-      // Convert Python dict string to JSON-compatible format
-      const jsonData = data
-        .replace(/'/g, '"')  // Replace single quotes with double quotes
-        .replace(/None/g, 'null')  // Replace Python None with null
-        .replace(/True/g, 'true')  // Replace Python True with true
-        .replace(/False/g, 'false');  // Replace Python False with false
-      
-      const parsed = JSON.parse(jsonData);
-      let orderInfo = null;
-
-      if (parsed.enrollment_id) {
-        // Fetch enrollment details
-        const response = await coursesService.getEnrollmentDetails(parsed.enrollment_id);
-        orderInfo = {
-          type: 'Course Enrollment',
-          id: parsed.enrollment_id,
-          studentName: response.student.first_name + ' ' + response.student.last_name,
-          studentEmail: response.student.email,
-          courseName: response.course.title,
-          amount: `${response.amount_paid} ${response.currency}`,
-          purchaseDate: new Date(response.enrolled_at).toLocaleDateString('en-US', {
-            year: 'numeric',
-            month: 'long',
-            day: 'numeric',
-          }),
-          status: response.is_active ? 'Active' : 'Inactive',
-          progress: response.progress_percentage,
-          paymentReference: response.payment_reference || 'N/A',
-        };
-      } else if (parsed.registration_id) {
-        // Fetch event registration details
-        const response = await eventsService.getRegistrationDetails(parsed.registration_id);
-        orderInfo = {
-          type: 'Event Registration',
-          id: parsed.registration_id,
-          studentName: response.attendee.first_name + ' ' + response.attendee.last_name,
-          studentEmail: response.attendee.email,
-          eventName: response.event.title,
-          eventDate: new Date(response.event.start_date).toLocaleDateString('en-US', {
-            year: 'numeric',
-            month: 'long',
-            day: 'numeric',
-          }),
-          registrationDate: new Date(response.registered_at).toLocaleDateString('en-US', {
-            year: 'numeric',
-            month: 'long',
-            day: 'numeric',
-          }),
-          status: response.is_cancelled ? 'Cancelled' : 'Confirmed',
-          attended: response.attended ? 'Yes' : 'No',
-        };
+      // Ticket codes are signed tokens: "C..." for courses, "E..." for events.
+      // The server verifies the signature and marks the ticket attended.
+      let response = null;
+      let type = null;
+
+      if (data.startsWith('C')) {
+        response = await coursesService.checkInEnrollment(data);
+        type = 'Course Enrollment';
+      } else if (data.startsWith('E')) {
+        response = await eventsService.checkInRegistration(data);
+        type = 'Event Registration';
       } else {
         throw new Error('Invalid QR code format');
       }
 
+      const orderInfo = {
+        type,
+        id: response.id,
+        name: response.name,
+        title: response.title,
+        alreadyCheckedIn: response.already_checked_in,
+      };
+
       setOrderData(orderInfo);
       setModalVisible(true);
     } catch (error) {
@@ -225,105 +192,32 @@ const QRScannerScreen = ({ navigation }) => {
                   <View style={styles.divider} />
 
                   <View style={styles.detailSection}>
-                    <Text style={styles.detailLabel}>Student Name</Text>
-                    <Text style={styles.detailValue}>{orderData.studentName}</Text>
+                    <Text style={styles.detailLabel}>Name</Text>
+                    <Text style={styles.detailValue}>{orderData.name}</Text>
                   </View>
 
                   <View style={styles.detailSection}>
-                    <Text style={styles.detailLabel}>Email</Text>
-                    <Text style={styles.detailValueSecondary}>
-                      {orderData.studentEmail}
+                    <Text style={styles.detailLabel}>
+                      {orderData.type === 'Course Enrollment' ? 'Course' : 'Event'}
                     </Text>
+                    <Text style={styles.detailValue}>{orderData.title}</Text>
                   </View>
 
-                  <View style={styles.divider} />
-
-                  {orderData.type === 'Course Enrollment' ? (
-                    <>
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Course</Text>
-                        <Text style={styles.detailValue}>{orderData.courseName}</Text>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Amount Paid</Text>
-                        <Text style={styles.detailValue}>{orderData.amount}</Text>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Purchase Date</Text>
-                        <Text style={styles.detailValueSecondary}>
-                          {orderData.purchaseDate}
-                        </Text>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Progress</Text>
-                        <Text style={styles.detailValue}>{orderData.progress}%</Text>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Status</Text>
-                        <View
-                          style={[
-                            styles.statusBadge,
-                            orderData.status === 'Active'
-                              ? styles.statusActive
-                              : styles.statusInactive,
-                          ]}
-                        >
-                          <Text style={styles.statusText}>{orderData.status}</Text>
-                        </View>
-                      </View>
-
-                      {orderData.paymentReference !== 'N/A' && (
-                        <View style={styles.detailSection}>
-                          <Text style={styles.detailLabel}>Payment Reference</Text>
-                          <Text style={styles.detailValueSecondary}>
-                            {orderData.paymentReference}
-                          </Text>
-                        </View>
-                      )}
-                    </>
-                  ) : (
-                    <>
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Event</Text>
-                        <Text style={styles.detailValue}>{orderData.eventName}</Text>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Event Date</Text>
-                        <Text style={styles.detailValue}>{orderData.eventDate}</Text>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Registration Date</Text>
-                        <Text style={styles.detailValueSecondary}>
-                          {orderData.registrationDate}
-                        </Text>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Status</Text>
-                        <View
-                          style={[
-                            styles.statusBadge,
-                            orderData.status === 'confirmed'
-                              ? styles.statusActive
-                              : styles.statusInactive,
-                          ]}
-                        >
-                          <Text style={styles.statusText}>{orderData.status}</Text>
-                        </View>
-                      </View>
-
-                      <View style={styles.detailSection}>
-                        <Text style={styles.detailLabel}>Attended</Text>
-                        <Text style={styles.detailValue}>{orderData.attended}</Text>
-                      </View>
-                    </>
-                  )}
+                  <View style={styles.detailSection}>
+                    <Text style={styles.detailLabel}>Check-in</Text>
+                    <View
+                      style={[
+                        styles.statusBadge,
+                        orderData.alreadyCheckedIn
+                          ? styles.statusInactive
+                          : styles.statusActive,
+                      ]}
+                    >
+                      <Text style={styles.statusText}>
+                        {orderData.alreadyCheckedIn ? 'Already checked in' : 'Checked in'}
+                      </Text>
+                    </View>
+                  </View>
 
                   <View style={styles.divider} />
 
@@ -517,10 +411,6 @@ const styles = StyleSheet.create({
     color: theme.colors.text.primary,
     fontWeight: theme.typography.fontWeight.semibold,
   },
-  detailValueSecondary: {
-    fontSize: theme.typography.fontSize.base,
-    color: theme.colors.text.secondary,
-  },
   detailValueCode: {
     fontSize: theme.typography.fontSize.sm,
     color: theme.colors.text.secondary,
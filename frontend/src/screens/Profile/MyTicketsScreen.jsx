@@ -43,8 +43,8 @@ const TicketCard = ({ item, onPressView }) => {
         <Text style={styles.cardTitle}>{title}</Text>
         <Text style={styles.cardSubtitle}>{subtitle}</Text>
         <View style={styles.cardActions}>
-          {item.qr_code ? (
-            <TouchableOpacity style={styles.viewButton} onPress={() => onPressView(item.qr_code, title)}>
+          {item.qr_code_url ? (
+            <TouchableOpacity style={styles.viewButton} onPress={() => onPressView(item.qr_code_url, title)}>
               <Ionicons name="qr-code-outline" size={18} color="#fff" />
               <Text style={styles.viewButtonText}>View Ticket</Text>
             </TouchableOpacity>
@@ -81,22 +81,22 @@ const MyTicketsScreen = ({ navigation }) => {
 
       // Normalize items - only include in-person courses/events with QR codes
       const normalizedEnrollments = enrollments
-        .filter(e => e.qr_code && e.course.is_in_person)
+        .filter(e => e.qr_code_url && e.course.is_in_person)
         .map(e => ({
           id: `course-${e.id}`,
           type: 'course',
           course: e.course,
-          qr_code: e.qr_code,
+          qr_code_url: e.qr_code_url,
           enrolled_at: e.enrolled_at,
         }));
 
       const normalizedRegistrations = registrations
-        .filter(r => r.qr_code && r.event.is_in_person)
+        .filter(r => r.qr_code_url && r.event.is_in_person)
         .map(r => ({
           id: `event-${r.id}`,
           type: 'event',
           event: r.event,
-          qr_code: r.qr_code,
+          qr_code_url: r.qr_code_url,
           registered_at: r.registered_at,
         }));
 
@@ -117,12 +117,12 @@ const MyTicketsScreen = ({ navigation }) => {
     }
   };
 
-  const handleViewQr = (qrBase64, title) => {
-    if (!qrBase64) {
+  const handleViewQr = (qrUrl, title) => {
+    if (!qrUrl) {
       Alert.alert('No Ticket', 'Ticket QR not available');
       return;
     }
-    navigation.navigate('QRCodeViewer', { title, qrBase64 });
+    navigation.navigate('QRCodeViewer', { title, qrUrl });
   };
 
   return (
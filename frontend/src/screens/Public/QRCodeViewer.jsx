@@ -3,14 +3,14 @@ import { View, Text, StyleSheet, Image, ScrollView } from 'react-native';
 import theme from '../../theme';
 
 const QRCodeViewer = ({ route }) => {
-  const { title, qrBase64 } = route.params;
+  const { title, qrUrl } = route.params;
 
   return (
     <ScrollView contentContainerStyle={styles.container}>
       <Text style={styles.title}>{title}</Text>
-      {qrBase64 ? (
+      {qrUrl ? (
         <Image
-          source={{ uri: `data:image/png;base64,${qrBase64}` }}
+          source={{ uri: qrUrl }}
           style={styles.qr}
           resizeMode="contain"
         />
@@ -30,6 +30,7 @@ const translations = {
     noComments: 'No comments yet',
     beFirst: 'Be the first to comment!',
     loading: 'Loading...',
+    loadMoreComments: 'Load older comments',
     error: 'Error',
     failedToLoad: 'Failed to load post',
     commentAdded: 'Comment added successfully',
@@ -42,6 +43,7 @@ const translations = {
     noComments: 'Pas encore de commentaires',
     beFirst: 'Soyez le premier à commenter !',
     loading: 'Chargement...',
+    loadMoreComments: 'Charger les commentaires précédents',
     error: 'Erreur',
     failedToLoad: 'Échec du chargement du post',
     commentAdded: 'Commentaire ajouté avec succès',
@@ -54,6 +56,8 @@ const PostDetailsScreen = ({ route, navigation }) => {
   const { t, language } = useTranslation(translations);
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsNext, setCommentsNext] = useState(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
   const [loading, setLoading] = useState(true);
   const [commentText, setCommentText] = useState('');
   const [submitting, setSubmitting] = useState(false);
@@ -68,12 +72,11 @@ const PostDetailsScreen = ({ route, navigation }) => {
 
   const loadPostAndComments = async () => {
     try {
-      const [postData, commentsData] = await Promise.all([
-        timelineService.getPost(postId),
-        timelineService.getComments(postId),
-      ]);
+      // The post detail embeds its latest comments and a cursor to older ones
+      const postData = await timelineService.getPost(postId);
       setPost(postData);
-      setComments(commentsData);
+      setComments(postData.comments?.results || []);
+      setCommentsNext(postData.comments?.next || null);
     } catch (error) {
       console.error('Error loading post:', error);
       Alert.alert(t('error'), t('failedToLoad'));
@@ -82,6 +85,26 @@ const PostDetailsScreen = ({ route, navigation }) => {
     }
   };
 
+  const reloadComments = async () => {
+    const commentsData = await timelineService.getComments(postId);
+    setComments(commentsData.results);
+    setCommentsNext(commentsData.next);
+  };
+
+  const loadMoreComments = async () => {
+    if (!commentsNext || loadingMoreComments) return;
+    setLoadingMoreComments(true);
+    try {
+      const commentsData = await timelineService.getComments(postId, commentsNext);
+      setComments((current) => [...current, ...commentsData.results]);
+      setCommentsNext(commentsData.next);
+    } catch (error) {
+      console.error('Error loading comments:', error);
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   const loadCurrentUser = async () => {
     try {
       const { authService } = require('../../api');
@@ -112,8 +135,7 @@ const PostDetailsScreen = ({ route, navigation }) => {
       await timelineService.addComment(postId, commentText.trim());
       setCommentText('');
       // Reload comments
-      const commentsData = await timelineService.getComments(postId);
-      setComments(commentsData);
+      await reloadComments();
     } catch (error) {
       Alert.alert(t('error'), t('failedToComment'));
     } finally {
@@ -188,8 +210,7 @@ const PostDetailsScreen = ({ route, navigation }) => {
             try {
               await timelineService.deleteComment(commentId);
               // Reload comments
-              const commentsData = await timelineService.getComments(postId);
-              setComments(commentsData);
+              await reloadComments();
               Alert.alert('Success', 'Comment deleted successfully');
             } catch (error) {
               console.error('Error deleting comment:', error);
@@ -303,7 +324,7 @@ const PostDetailsScreen = ({ route, navigation }) => {
 
           {post.image && (
             <Image
-              source={{ uri: post.image }}
+              source={{ uri: post.image_variants?.large || post.image }}
               style={styles.postImage}
               resizeMode="cover"
             />
@@ -355,6 +376,18 @@ const PostDetailsScreen = ({ route, navigation }) => {
               </View>
             ))
           )}
+
+          {commentsNext && (
+            <TouchableOpacity
+              style={styles.loadMoreComments}
+              onPress={loadMoreComments}
+              disabled={loadingMoreComments}
+            >
+              <Text style={styles.loadMoreCommentsText}>
+                {loadingMoreComments ? t('loading') : t('loadMoreComments')}
+              </Text>
+            </TouchableOpacity>
+          )}
         </View>
       </ScrollView>
 
@@ -471,6 +504,15 @@ const styles = StyleSheet.create({
     color: '#1A1A1A',
     marginBottom: 16,
   },
+  loadMoreComments: {
+    alignItems: 'center',
+    paddingVertical: 12,
+  },
+  loadMoreCommentsText: {
+    fontSize: 14,
+    fontWeight: '600',
+    color: theme.colors.primary,
+  },
   emptyComments: {
     alignItems: 'center',
     paddingVertical: 40,